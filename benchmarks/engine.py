@@ -0,0 +1,54 @@
+"""
+HSLuv conversions of kleur's own engine, compared to the ones of the hsluv package.
+
+Run with: python -m benchmarks.engine [number of runs]
+"""
+
+import sys
+from timeit import timeit
+from typing import TYPE_CHECKING
+
+import hsluv
+from based_utils.cli import write_lines
+
+from kleur import hsluv_engine
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from kleur.hsluv_engine import Floats
+
+# The palette grid: all hues, at a handful of lightnesses.
+_HSLUVS = [(h * 5.0, 100.0, li * 10.0) for h in range(72) for li in range(1, 10)]
+_RGBS = [
+    (r / 255, g / 255, b / 255)
+    for r in range(0, 256, 17)
+    for g in range(0, 256, 17)
+    for b in range(0, 256, 17)
+]
+
+
+def _seconds_per_conversion(
+    convert: Callable[[Floats], Floats], values: list[Floats], n: int
+) -> float:
+    def convert_all() -> None:
+        for v in values:
+            convert(v)
+
+    return timeit(convert_all, number=n) / n / len(values)
+
+
+def run(n: int) -> list[str]:
+    lines = [f"{'':<16}{'hsluv':>12}{'kleur':>12}{'speedup':>10}"]
+    for name, values in ("hsluv_to_rgb", _HSLUVS), ("rgb_to_hsluv", _RGBS):
+        t_ref = _seconds_per_conversion(getattr(hsluv, name), values, n)
+        t_own = _seconds_per_conversion(getattr(hsluv_engine, name), values, n)
+        lines.append(
+            f"{name:<16}{t_ref * 1e6:>10.2f}us{t_own * 1e6:>10.2f}us"
+            f"{t_ref / t_own:>9.2f}x"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    write_lines(run(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,105 @@
+"""
+Memory footprint of Color instances, compared to the former (__dict__ based) layout.
+
+Run with: python -m benchmarks.memory [number of colors]
+"""
+
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from based_utils.class_utils import Modifier, WithAttrModifiers
+from based_utils.cli import write_lines
+from based_utils.interpol import trim, trim_cyclic
+
+from kleur import RGB, Color, conversion_cache
+from kleur.color import _HSL
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+@dataclass(frozen=True)
+class DictColor(WithAttrModifiers):
+    """Color as it was laid out before: frozen dataclass with cached properties."""
+
+    hue: float = 0
+    saturation: float = 1
+    lightness: float = 0.5
+
+    @property
+    def _attr_modifiers(self) -> dict[str, Modifier]:
+        return {"hue": trim_cyclic, "saturation": trim, "lightness": trim}
+
+    @cached_property
+    def _as_hsl(self) -> _HSL:
+        return _HSL(self.hue * 360, self.saturation * 100, self.lightness * 100)
+
+    @cached_property
+    def as_hex(self) -> str:
+        return self._as_hsl.as_hex
+
+    @cached_property
+    def as_rgb(self) -> RGB:
+        return self._as_hsl.as_rgb
+
+    @cached_property
+    def contrasting_shade(self) -> DictColor:
+        return DictColor(self.hue, self.saturation, (self.lightness + 0.5) % 1)
+
+    @cached_property
+    def contrasting_shade_pair(self) -> tuple[DictColor, DictColor]:
+        return self, self.contrasting_shade
+
+
+type _AnyColor = Color | DictColor
+
+
+def _create(cls: type[_AnyColor], n: int) -> list[_AnyColor]:
+    return [cls(i / n, 0.75, 0.5) for i in range(n)]
+
+
+def _create_and_convert(cls: type[_AnyColor], n: int) -> list[_AnyColor]:
+    colors = _create(cls, n)
+    for c in colors:
+        _ = c.as_hex, c.as_rgb
+    return colors
+
+
+def _create_and_highlight(cls: type[_AnyColor], n: int) -> list[_AnyColor]:
+    """Typical use by Highlighter: conversions of a color & its contrasting shade."""
+    colors = _create_and_convert(cls, n)
+    for c in colors:
+        for k in c.contrasting_shade_pair:
+            _ = k.as_hex, k.as_rgb
+    return colors
+
+
+def _bytes_per_color(
+    scenario: Callable[[type[_AnyColor], int], list[_AnyColor]],
+    cls: type[_AnyColor],
+    n: int,
+) -> float:
+    # Start cold, so both layouts pay for filling the conversion cache.
+    conversion_cache.clear()
+    tracemalloc.start()
+    colors = scenario(cls, n)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del colors
+    return current / n
+
+
+def run(n: int) -> Iterator[str]:
+    yield f"Memory per color ({n} colors):"
+    yield f"{'':<24}{'dict':>10}{'slots':>10}{'ratio':>8}"
+    for scenario in _create, _create_and_convert, _create_and_highlight:
+        old, new = (_bytes_per_color(scenario, cls, n) for cls in (DictColor, Color))
+        name = scenario.__name__.strip("_")
+        yield f"{name:<24}{old:>9.0f}B{new:>9.0f}B{old / new:>7.2f}x"
+
+
+if __name__ == "__main__":
+    write_lines(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,73 @@
+"""
+Scaling of the parallel batch conversions with the number of threads (or processes).
+
+Threads only run in parallel on free-threaded builds of Python (with the GIL
+disabled); with the GIL enabled, compare with --pool processes.
+
+Run with: python -m benchmarks.scaling [--pool threads|processes] [-n COLORS]
+"""
+
+import os
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from based_utils.cli import write_lines
+
+from kleur import Color, Gradient, conversion_cache
+from kleur.parallel import colors_as_hex, colors_from_hex, gil_enabled, sample_gradient
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from kleur.parallel import Pool
+
+
+def _cases(n: int) -> dict[str, Callable[[int, Pool], object]]:
+    # Spread over the whole RGB cube, so (nearly) every color needs a conversion.
+    hexes = [f"{i * 0xFFFFFF // n:06x}" for i in range(n)]
+    colors = colors_from_hex(hexes, workers=1)
+    gradient = Gradient.evenly_spaced(Color(0.1), Color(0.5, 0.5, 0.2), Color(0.9))
+    positions = [i / n for i in range(n)]
+    return {
+        "colors_from_hex": lambda w, p: colors_from_hex(hexes, workers=w, pool=p),
+        "colors_as_hex": lambda w, p: colors_as_hex(colors, workers=w, pool=p),
+        "sample_gradient": lambda w, p: colors_as_hex(
+            sample_gradient(gradient, positions, workers=w, pool=p), workers=w, pool=p
+        ),
+    }
+
+
+def _seconds(case: Callable[[int, Pool], object], workers: int, pool: Pool) -> float:
+    conversion_cache.clear()
+    start = perf_counter()
+    case(workers, pool)
+    return perf_counter() - start
+
+
+def run(n: int, pool: Pool, max_workers: int) -> list[str]:
+    counts = [w for w in (1, 2, 4, 8, 16, 32, 64) if w < max_workers] + [max_workers]
+    lines = [
+        f"{n} colors, {pool} (GIL {'enabled' if gil_enabled() else 'disabled'})",
+        f"{'':<20}" + "".join(f"{w:>8}x" for w in counts),
+    ]
+    for name, case in _cases(n).items():
+        times = [_seconds(case, w, pool) for w in counts]
+        speedups = "".join(f"{times[0] / t:>9.2f}" for t in times)
+        lines.append(f"{name:<20}{speedups}   ({times[0] * 1e3:.0f}ms sequential)")
+    return lines
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="python -m benchmarks.scaling")
+    parser.add_argument("--pool", choices=["threads", "processes"], default="threads")
+    parser.add_argument("-n", "--number-of-colors", type=int, default=200_000)
+    parser.add_argument("-w", "--max-workers", type=int, default=os.process_cpu_count())
+    args = parser.parse_args()
+    # The process wide conversion cache is sized to fit all conversions.
+    conversion_cache.resize(max(args.number_of_colors, 1 << 16))
+    write_lines(run(args.number_of_colors, args.pool, args.max_workers or 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Size & speed of the binary format of kleur.serialization, compared to pickle.
+
+Run with: python -m benchmarks.serialization [number of colors]
+"""
+
+import pickle
+import sys
+from timeit import timeit
+from typing import TYPE_CHECKING
+
+from based_utils.cli import write_lines
+
+from kleur import Color, ColorArray, Colors
+from kleur.serialization import dump_colors, dump_palette, load_colors, load_palette
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_RUNS = 20
+
+
+def _us(func: Callable[[], object]) -> float:
+    return timeit(func, number=_RUNS) / _RUNS * 1e6
+
+
+def _line(
+    label: str, dump: Callable[[], bytes], load: Callable[[bytes], object]
+) -> str:
+    data = dump()
+    t_dump, t_load = _us(dump), _us(lambda: load(data))
+    return f"{label:<24}{len(data):>12,}{t_dump:>12.1f}us{t_load:>12.1f}us"
+
+
+def _colors_of(palette_cls: type) -> dict[str, Color]:
+    # Classes are pickled by reference, so pickle their colors instead.
+    return {k: v for k, v in vars(palette_cls).items() if isinstance(v, Color)}
+
+
+def run(n: int) -> list[str]:
+    colors = ColorArray.from_colors(
+        Color(i / n, 0.5 + i % 2 / 2, 0.5) for i in range(n)
+    )
+    # Conversions are cached along the way, but never end up in the output.
+    _ = colors.as_hex
+    color_list = list(colors)
+    return [
+        f"{'':<24}{'bytes':>12}{'dump':>14}{'load':>14}",
+        _line("pickle list[Color]", lambda: pickle.dumps(color_list), pickle.loads),
+        _line("pickle ColorArray", lambda: pickle.dumps(colors), pickle.loads),
+        _line("kleur ColorArray", lambda: dump_colors(colors), load_colors),
+        _line("pickle Colors", lambda: pickle.dumps(_colors_of(Colors)), pickle.loads),
+        _line("kleur Colors", lambda: dump_palette(Colors), load_palette),
+    ]
+
+
+if __name__ == "__main__":
+    write_lines(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
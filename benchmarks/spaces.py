@@ -0,0 +1,54 @@
+"""
+Color spaces compared: conversions in both directions & generating shades.
+
+Run with: python -m benchmarks.spaces [number of runs]
+"""
+
+import sys
+from timeit import timeit
+
+from based_utils.cli import write_lines
+
+from kleur import Color, conversion_cache
+from kleur.spaces import SPACES, set_color_space
+
+# The palette grid: all hues, at a handful of lightnesses.
+_HSLS = [(h * 5.0, 100.0, li * 10.0) for h in range(72) for li in range(1, 10)]
+_RGBS = [
+    (r / 255, g / 255, b / 255)
+    for r in range(0, 256, 17)
+    for g in range(0, 256, 17)
+    for b in range(0, 256, 17)
+]
+_COLORS = [Color(h / 72) for h in range(72)]
+
+
+def _shades() -> None:
+    conversion_cache.clear()
+    for color in _COLORS:
+        for shade in color.shades(20):
+            _ = shade.as_hex
+
+
+def run(n: int) -> list[str]:
+    names = list(SPACES)
+    lines = [f"{'':<12}" + "".join(f"{name:>12}" for name in names)]
+    timings: dict[str, list[float]] = {"to_rgb": [], "from_rgb": [], "shades": []}
+    for name, space in SPACES.items():
+        set_color_space(name)
+        for label, values, convert in (
+            ("to_rgb", _HSLS, space.to_rgb),
+            ("from_rgb", _RGBS, space.from_rgb),
+        ):
+            t = timeit(lambda c=convert, vs=values: [c(v) for v in vs], number=n)
+            timings[label].append(t / n / len(values) * 1e6)
+        shades = len(_COLORS) * 19
+        timings["shades"].append(timeit(_shades, number=n) / n / shades * 1e6)
+    set_color_space("hsluv")
+    for label, us in timings.items():
+        lines.append(f"{label:<12}" + "".join(f"{t:>10.2f}us" for t in us))
+    return lines
+
+
+if __name__ == "__main__":
+    write_lines(run(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
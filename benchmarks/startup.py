@@ -0,0 +1,56 @@
+"""
+Startup time of the package & short command line invocations.
+
+Every case runs in a fresh interpreter; the time of an empty interpreter run
+is listed first, and subtracted from the other cases.
+
+Run with: python -m benchmarks.startup [number of runs per case]
+"""
+
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+from based_utils.cli import write_lines
+
+_CLI = "import sys; from kleur.cli import main; sys.argv[0] = 'kleur'; main()"
+
+_CASES = {
+    "python (empty)": ["-c", "pass"],
+    "import kleur": ["-c", "import kleur"],
+    "from kleur import Color": ["-c", "from kleur import Color"],
+    "from kleur import Colors": ["-c", "from kleur import Colors"],
+    "import kleur.cli": ["-c", "import kleur.cli"],
+    "kleur -h": ["-c", _CLI, "-h"],
+    "kleur shades --format css": [
+        "-c",
+        _CLI,
+        "shades",
+        "-c",
+        "7ab1e5",
+        "--format",
+        "css",
+    ],
+    "kleur palette --format json": ["-c", _CLI, "palette", "--format", "json"],
+}
+
+
+def _run_time(args: list[str]) -> float:
+    start = perf_counter()
+    subprocess.run([sys.executable, *args], check=True, capture_output=True)  # noqa: S603
+    return perf_counter() - start
+
+
+def run(n: int) -> list[str]:
+    lines = [f"Startup time (median of {n} runs):", f"{'':<32}{'total':>10}{'own':>10}"]
+    empty = 0.0
+    for name, args in _CASES.items():
+        t = median(_run_time(args) for _ in range(n))
+        empty = empty or t
+        lines.append(f"{name:<32}{t * 1e3:>8.1f}ms{(t - empty) * 1e3:>8.1f}ms")
+    return lines
+
+
+if __name__ == "__main__":
+    write_lines(run(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,223 @@
+"""
+Throughput & peak memory of the hot paths of the Color API and the CLI commands.
+
+Run with: python -m benchmarks.suite [--save results.json] [--compare baseline.json]
+
+When comparing, cases that got slower (or use more memory) than the threshold
+are flagged as regressions, and the exit code will be 1.
+"""
+
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+from based_utils.cli import write_lines
+
+from kleur import Color, ColorStr, conversion_cache
+from kleur.cli.palette_gen import PaletteGenerator
+from kleur.cli.shades_gen import ShadesGenerator
+from kleur.formatting import ColorDepth, set_color_depth
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+type _Case = Callable[[int], object]
+
+_SIZES = [100, 10_000]
+_MIN_SECONDS = 0.2
+
+
+def _colors(n: int) -> list[Color]:
+    return [Color(i / n, 0.75, 0.25 + i % 7 / 12) for i in range(n)]
+
+
+def _hex_values(n: int) -> list[str]:
+    # Spread evenly over all 24-bit values, so conversions can't just be cached.
+    return [f"{i * ((1 << 24) - 1) // max(n - 1, 1):06x}" for i in range(n)]
+
+
+def _from_hex(n: int) -> _Case:
+    values = _hex_values(n)
+    return lambda _: [Color.from_hex(v) for v in values]
+
+
+def _as_hex(n: int) -> _Case:
+    def case(_: int) -> list[str]:
+        return [c.as_hex for c in _colors(n)]
+
+    return case
+
+
+def _blend(n: int) -> _Case:
+    colors = _colors(n)
+    return lambda _: [
+        c.blend(k, 0.3) for c, k in zip(colors, reversed(colors), strict=True)
+    ]
+
+
+def _align_with(n: int) -> _Case:
+    colors = _colors(n)
+    return lambda _: [
+        c.align_with(k) for c, k in zip(colors, reversed(colors), strict=True)
+    ]
+
+
+def _shade(n: int) -> _Case:
+    colors = _colors(n)
+    return lambda _: [c.shade(0.5) for c in colors]
+
+
+def _color_str(n: int) -> _Case:
+    colors = _colors(n)
+    return lambda _: [ColorStr(" text ", c, c.contrasting_shade) for c in colors]
+
+
+def _cli(*argv: str) -> Callable[[int], _Case]:
+    def setup(_n: int) -> _Case:
+        parser = ArgumentParser()
+        subparsers = parser.add_subparsers(required=True)
+        for cls in PaletteGenerator, ShadesGenerator:
+            cls(subparsers.add_parser(cls._name))
+        # Measure the actual work (instead of reading the output cache).
+        args = parser.parse_args([*argv, "--no-cache"])
+
+        def case(_: int) -> str:
+            with redirect_stdout(StringIO()) as f:
+                args.func(args)
+            return f.getvalue()
+
+        return case
+
+    return setup
+
+
+class _Benchmark(NamedTuple):
+    name: str
+    sizes: list[int]
+    setup: Callable[[int], _Case]
+
+
+_BENCHMARKS = [
+    _Benchmark("Color.from_hex", _SIZES, _from_hex),
+    _Benchmark("Color.as_hex", _SIZES, _as_hex),
+    _Benchmark("Color.blend", _SIZES, _blend),
+    _Benchmark("Color.align_with", _SIZES, _align_with),
+    _Benchmark("Color.shade", _SIZES, _shade),
+    _Benchmark("ColorStr", _SIZES, _color_str),
+    _Benchmark("kleur palette", [1], _cli("palette")),
+    _Benchmark(
+        "kleur palette -s 99 -v 99", [1], _cli("palette", "-s", "99", "-v", "99")
+    ),
+    _Benchmark("kleur shades", [1], _cli("shades", "-c", "7ab1e5", "-i")),
+    _Benchmark(
+        "kleur shades (2 colors)",
+        [1],
+        _cli("shades", "-c", "badddd", "-k", "aa601f", "-d", "66", "-s", "99", "-i"),
+    ),
+]
+
+
+class Result(NamedTuple):
+    seconds: float
+    ops_per_second: float
+    peak_bytes: int
+
+
+def _measure(case: _Case, n: int) -> Result:
+    # Every run starts cold, so conversions are actually measured.
+    best, total, runs = float("inf"), 0.0, 0
+    while total < _MIN_SECONDS or runs < 3:  # noqa: PLR2004
+        conversion_cache.clear()
+        start = perf_counter()
+        case(n)
+        elapsed = perf_counter() - start
+        best, total, runs = min(best, elapsed), total + elapsed, runs + 1
+
+    conversion_cache.clear()
+    tracemalloc.start()
+    case(n)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(best, n / best, peak)
+
+
+def run_all(name_filter: str = "") -> dict[str, Result]:
+    # Measure the styled output the way a true color terminal would get it.
+    set_color_depth(ColorDepth.TRUE_COLOR)
+    results = {}
+    for name, sizes, setup in _BENCHMARKS:
+        if name_filter in name:
+            for n in sizes:
+                results[f"{name} [{n}]"] = _measure(setup(n), n)
+    return results
+
+
+def save(results: dict[str, Result], path: Path) -> None:
+    meta = {"python": sys.version, "platform": platform.platform()}
+    data = {"meta": meta, "results": {k: r._asdict() for k, r in results.items()}}
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def load(path: Path) -> dict[str, Result]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {k: Result(**r) for k, r in data["results"].items()}
+
+
+def _change(new: float, old: float) -> float:
+    return new / old - 1 if old else 0
+
+
+def report(
+    results: dict[str, Result],
+    baseline: dict[str, Result] = None,
+    threshold: float = 0.1,
+) -> tuple[list[str], list[str]]:
+    """Tabulate results & collect the cases that regressed beyond the threshold."""
+    lines = [
+        f"{'':<36}{'time':>10}{'ops/s':>12}{'peak':>10}{'speed':>10}{'memory':>10}"
+    ]
+    regressions = []
+    for name, (seconds, ops, peak) in results.items():
+        line = f"{name:<36}{seconds * 1000:>8,.2f}ms{ops:>12,.0f}{peak / 1024:>8,.0f}KB"
+        if baseline and name in baseline:
+            old = baseline[name]
+            speed = _change(ops, old.ops_per_second)
+            memory = _change(peak, old.peak_bytes)
+            line += f"{speed:>+10.1%}{memory:>+10.1%}"
+            if speed < -threshold or memory > threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        lines.append(line)
+    return lines, regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("-k", "--filter", default="", help="only run matching cases")
+    parser.add_argument("--save", type=Path, metavar="FILE")
+    parser.add_argument("--compare", type=Path, metavar="FILE")
+    parser.add_argument(
+        "--threshold", type=float, default=10, help="regression threshold (%%)"
+    )
+    args = parser.parse_args()
+
+    results = run_all(args.filter)
+    baseline = load(args.compare) if args.compare else None
+    lines, regressions = report(results, baseline, args.threshold / 100)
+    write_lines(lines)
+    if args.save:
+        save(results, args.save)
+    if regressions:
+        write_lines(["", f"{len(regressions)} regression(s) beyond {args.threshold}%"])
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,32 @@
-from .color import RGB, Color, blend_colors, normalize_rgb_hex
-from .formatting import Colored, ColorHighlighter, ColorStr, Highlighter
-from .palettes import BLACK, GREY, WHITE, AltColors, Colors, c
+"""
+HSLuv based color utilities.
+
+Public names are imported on first access (PEP 562), so importing the package
+(e.g. by the command line tool) only loads the modules that are actually used.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .arrays import ColorArray
+    from .caching import CacheStats, LRUCache
+    from .color import RGB, Color, blend_colors, conversion_cache, normalize_rgb_hex
+    from .colormaps import Colormap
+    from .formatting import Colored, ColorHighlighter, ColorStr, Highlighter
+    from .gradients import Gradient
+    from .palettes import BLACK, GREY, WHITE, AltColors, Colors, c
+
+_MODULES = {
+    "arrays": ["ColorArray"],
+    "caching": ["CacheStats", "LRUCache"],
+    "color": ["RGB", "Color", "blend_colors", "conversion_cache", "normalize_rgb_hex"],
+    "colormaps": ["Colormap"],
+    "formatting": ["Colored", "ColorHighlighter", "ColorStr", "Highlighter"],
+    "gradients": ["Gradient"],
+    "palettes": ["BLACK", "GREY", "WHITE", "AltColors", "Colors", "c"],
+}
+_LAZY_NAMES = {name: module for module, names in _MODULES.items() for name in names}
 
 __all__ = [
     "BLACK",
@@ -8,13 +34,32 @@ __all__ = [
     "RGB",
     "WHITE",
     "AltColors",
+    "CacheStats",
     "Color",
+    "ColorArray",
     "ColorHighlighter",
     "ColorStr",
     "Colored",
+    "Colormap",
     "Colors",
+    "Gradient",
     "Highlighter",
+    "LRUCache",
     "blend_colors",
     "c",
+    "conversion_cache",
     "normalize_rgb_hex",
 ]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY_NAMES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(f".{_LAZY_NAMES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,311 @@
+from array import array
+from functools import cached_property
+from itertools import repeat
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, overload
+
+from based_utils.interpol import mapped, mapped_cyclic, trim, trim_cyclic
+
+from .color import _HSL, RGB, Color, normalize_rgb_hex
+from .contrast import contrast_ratio, shade_for_contrast
+from .spaces import color_space
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer, Callable, Iterable, Iterator
+
+type Values = float | Iterable[float]
+
+# Column of values: an array of doubles, or a view on them (e.g. in shared memory).
+type Column = array[float] | memoryview[float]
+
+
+def _broadcast(values: Values, n: int) -> Iterable[float]:
+    return repeat(values, n) if isinstance(values, int | float) else values
+
+
+def _deduplicated[K, V](keys: Iterable[K], convert: Callable[[K], V]) -> list[V]:
+    """Convert keys one by one, but each distinct key only once (cached per call)."""
+    ks = list(keys)
+    converted = {k: convert(k) for k in dict.fromkeys(ks)}
+    return [converted[k] for k in ks]
+
+
+class _CachedPerSpace[T]:
+    """Like cached_property, but computed again once the color space has changed."""
+
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        self._func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        # Stored under another name, as instance attributes would hide this one.
+        self._attr = f"_{name}_per_space"
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> _CachedPerSpace[T]: ...
+
+    @overload
+    def __get__(self, instance: object, owner: type) -> T: ...
+
+    def __get__(self, instance: object, owner: type) -> T | _CachedPerSpace[T]:
+        if instance is None:
+            return self
+        space = color_space()
+        cached = instance.__dict__.get(self._attr)
+        if cached is None or cached[0] is not space:
+            cached = instance.__dict__[self._attr] = space, self._func(instance)
+        return cached[1]
+
+
+class ColorArray:
+    """
+    Batch of colors, stored as contiguous arrays of hue, saturation & lightness.
+
+    Conversions from and to RGB / hex aren't vectorized: every color is converted
+    on its own (like the corresponding Color methods, with identical results),
+    but repeated colors in a batch are converted only once:
+    >>> hex_strs = ["08f", "0f8", "80f", "8f0", "f08", "f80"]
+    >>> colors = ColorArray.from_hex(hex_strs)
+    >>> colors.as_hex == [Color.from_hex(h).as_hex for h in hex_strs]
+    True
+    >>> colors.contrasting_shade.as_hex
+    ['001531', '006935', 'ebe4ff', '366b00', '2b0012', '4a2300']
+
+    Converted values are cached per color space (which might change later on):
+    >>> from kleur.spaces import set_color_space
+    >>> orange = ColorArray([30 / 360], [1], [0.6])
+    >>> orange.as_hex
+    ['e37100']
+    >>> set_color_space("oklch")
+    >>> orange.as_hex, orange[0].as_hex
+    (['ee1300'], 'ee1300')
+    >>> set_color_space("hsluv")
+    """
+
+    def __init__(
+        self,
+        hues: Iterable[float] = (),
+        saturations: Iterable[float] = (),
+        lightnesses: Iterable[float] = (),
+    ) -> None:
+        self.hues: Column = array("d", [trim_cyclic(h) for h in hues])
+        self.saturations: Column = array("d", [trim(s) for s in saturations])
+        self.lightnesses: Column = array("d", [trim(li) for li in lightnesses])
+        if not len(self.hues) == len(self.saturations) == len(self.lightnesses):
+            raise ValueError(self)
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # Only the columns are pickled (not the cached conversions).
+        columns = self.hues, self.saturations, self.lightnesses
+        return ColorArray.wrapping, tuple(array("d", c) for c in columns)
+
+    def __repr__(self) -> str:
+        return f"ColorArray({list(self)})"
+
+    def __len__(self) -> int:
+        return len(self.hues)
+
+    def __iter__(self) -> Iterator[Color]:
+        for h, s, li in zip(self.hues, self.saturations, self.lightnesses, strict=True):
+            yield Color(h, s, li)
+
+    @overload
+    def __getitem__(self, index: int) -> Color: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ColorArray: ...
+
+    def __getitem__(self, index: int | slice) -> Color | ColorArray:
+        hs, ss, ls = self.hues, self.saturations, self.lightnesses
+        if isinstance(index, slice):
+            return ColorArray(hs[index], ss[index], ls[index])
+        return Color(hs[index], ss[index], ls[index])
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[Color]) -> ColorArray:
+        cs = list(colors)
+        return cls(
+            [c.hue for c in cs], [c.saturation for c in cs], [c.lightness for c in cs]
+        )
+
+    @classmethod
+    def wrapping(
+        cls, hues: Column, saturations: Column, lightnesses: Column
+    ) -> ColorArray:
+        """
+        Create a ColorArray around existing columns, without copying (or trimming).
+
+        :param hues: hues (0 - 1, like the ones of ColorArray instances)
+        :param saturations: saturations (0 - 1)
+        :param lightnesses: lightnesses (0 - 1)
+        :return: ColorArray instance
+        """
+        if not len(hues) == len(saturations) == len(lightnesses):
+            raise ValueError(hues, saturations, lightnesses)
+        colors = cls.__new__(cls)
+        colors.hues, colors.saturations = hues, saturations
+        colors.lightnesses = lightnesses
+        return colors
+
+    @classmethod
+    def concatenated(cls, arrays: Iterable[ColorArray]) -> ColorArray:
+        hues, saturations, lightnesses = array("d"), array("d"), array("d")
+        for a in arrays:
+            hues.extend(a.hues)
+            saturations.extend(a.saturations)
+            lightnesses.extend(a.lightnesses)
+        return cls.wrapping(hues, saturations, lightnesses)
+
+    @classmethod
+    def filled(cls, color: Color, n: int) -> ColorArray:
+        return cls(
+            repeat(color.hue, n),
+            repeat(color.saturation, n),
+            repeat(color.lightness, n),
+        )
+
+    @classmethod
+    def _from_hsls(cls, hsls: Iterable[_HSL]) -> ColorArray:
+        return cls.from_colors(Color._from_hsl(c) for c in hsls)  # noqa: SLF001
+
+    @cached_property
+    def _as_hsls(self) -> list[_HSL]:
+        return [_HSL(h * 360, s * 100, li * 100) for h, s, li in self.as_tuples]
+
+    @property
+    def as_tuples(self) -> Iterator[tuple[float, float, float]]:
+        return zip(self.hues, self.saturations, self.lightnesses, strict=True)
+
+    @classmethod
+    def from_hex(cls, rgb_hexes: Iterable[str]) -> ColorArray:
+        """
+        Create a ColorArray from RGB hex strings.
+
+        :param rgb_hexes: RGB hex strings (may start with '#')
+        :return: ColorArray instance
+
+        >>> ColorArray.from_hex(["808303", "#0af"]).as_rgb
+        [(128, 131, 3), (0, 170, 255)]
+        """
+        hexes = (normalize_rgb_hex(h) for h in rgb_hexes)
+        return cls._from_hsls(_deduplicated(hexes, _HSL.from_hex))
+
+    @_CachedPerSpace
+    def as_hex(self) -> list[str]:
+        return _deduplicated(self._as_hsls, attrgetter("as_hex"))
+
+    @classmethod
+    def from_rgb(cls, rgbs: Iterable[RGB]) -> ColorArray:
+        """
+        Create a ColorArray from RGB values.
+
+        :param rgbs: RGB instances
+        :return: ColorArray instance
+
+        >>> ColorArray.from_rgb([(128, 131, 3), (0, 170, 255)]).as_hex
+        ['808303', '00aaff']
+        """
+        return cls._from_hsls(_deduplicated(rgbs, _HSL.from_rgb))
+
+    @classmethod
+    def from_packed_rgb(cls, packed: Buffer) -> ColorArray:
+        """
+        Create a ColorArray from packed RGB values: r, g, b (one byte each) per color.
+
+        >>> ColorArray.from_packed_rgb(bytes.fromhex("808303 00aaff")).as_hex
+        ['808303', '00aaff']
+        """
+        channels = iter(memoryview(packed).cast("B"))
+        return cls.from_rgb(zip(channels, channels, channels, strict=True))
+
+    @_CachedPerSpace
+    def as_rgb(self) -> list[RGB]:
+        return _deduplicated(self._as_hsls, attrgetter("as_rgb"))
+
+    def with_hue(self, hue: Values) -> ColorArray:
+        return ColorArray(
+            _broadcast(hue, len(self)), self.saturations, self.lightnesses
+        )
+
+    def saturated(self, saturation: Values) -> ColorArray:
+        return ColorArray(
+            self.hues, _broadcast(saturation, len(self)), self.lightnesses
+        )
+
+    def shade(self, lightness: Values) -> ColorArray:
+        return ColorArray(self.hues, self.saturations, _broadcast(lightness, len(self)))
+
+    @_CachedPerSpace
+    def has_ambiguous_hue(self) -> list[bool]:
+        """Determine for each color if it has a visually ambiguous hue."""
+        return [r == g == b for r, g, b in self.as_rgb]
+
+    def align_with(self, other: ColorArray | Color) -> tuple[ColorArray, ColorArray]:
+        """
+        Align colors pairwise with other colors, when their hues are ambiguous.
+
+        >>> cs = ColorArray.from_colors([Color(0.4, 0, 0.5), Color(0.4, 1, 0.5)])
+        >>> cs.align_with(Color(0.6, 0, 0.75))
+        (ColorArray([HSLuv(216.00°,   0.00%,  50.00%), HSLuv(144.00°, 100.00%,  50.00%)]), ColorArray([HSLuv(216.00°,   0.00%,  75.00%), HSLuv(144.00°,   0.00%,  75.00%)]))
+        """  # noqa: E501
+        if isinstance(other, Color):
+            other = ColorArray.filled(other, len(self))
+        hcs, hks = [], []
+        pairs = zip(self.hues, self.has_ambiguous_hue, strict=True)
+        others = zip(other.hues, other.has_ambiguous_hue, strict=True)
+        for (h_c, ambiguous_c), (h_k, ambiguous_k) in zip(pairs, others, strict=True):
+            hc = h_k if ambiguous_c else h_c
+            hcs.append(hc)
+            hks.append(hc if ambiguous_k else h_k)
+        return self.with_hue(hcs), other.with_hue(hks)
+
+    def blend(self, other: ColorArray | Color, amount: Values = 0.5) -> ColorArray:
+        """
+        Blend colors pairwise with other colors.
+
+        >>> cs = ColorArray.from_colors([Color(0.1, 1, 0.5), Color(0.4, 0, 0.5)])
+        >>> cs.blend(Color(0.9, 0.25, 0.75), 0.25)
+        ColorArray([HSLuv( 18.00°,  81.25%,  56.25%), HSLuv(324.00°,   6.25%,  56.25%)])
+        """
+        c, k = self.align_with(other)
+        hs, ss, ls = [], [], []
+        amounts = _broadcast(amount, len(self))
+        for (hc, sc, lc), (hk, sk, lk), a in zip(
+            c.as_tuples, k.as_tuples, amounts, strict=True
+        ):
+            hs.append(mapped_cyclic(a, (hc, hk)))
+            ss.append(mapped(a, (sc, sk)))
+            ls.append(mapped(a, (lc, lk)))
+        return ColorArray(hs, ss, ls)
+
+    @cached_property
+    def contrasting_shade(self) -> ColorArray:
+        """Colors with a lightness that contrasts with the current colors."""
+        return self.shade([(li + 0.5) % 1 for li in self.lightnesses])
+
+    def contrast_ratios(self, against: Color) -> list[float]:
+        """Contrast ratios (as defined by WCAG 2) of the colors with another color."""
+        rgb = against.as_rgb
+        return [contrast_ratio(c, rgb) for c in self.as_rgb]
+
+    def meets_contrast(self, against: Color, min_ratio: float = 4.5) -> list[bool]:
+        """
+        Check which of the colors have at least the given contrast with another color.
+
+        >>> ramp = ColorArray.filled(Color.from_hex("08f"), 9)
+        >>> ramp = ramp.shade([i / 8 for i in range(9)])
+        >>> ramp.meets_contrast(Color.from_hex("fff"))
+        [True, True, True, True, False, False, False, False, False]
+        """
+        return [r >= min_ratio for r in self.contrast_ratios(against)]
+
+    def shades_for_contrast(
+        self, against: Color, min_ratio: float = 4.5
+    ) -> list[Color | None]:
+        """
+        Shades of the colors nearest to them, with at least the given contrast ratio.
+
+        Colors with the same hue & saturation (like the colors of a ramp)
+        share the same luminance table, so it is built only once for all of them.
+        """
+        return [shade_for_contrast(c, against, min_ratio) for c in self]
@@ -0,0 +1,250 @@
+"""
+Quality checks of a palette, on all pairs of its colors in all shades & vibrances.
+
+Pairs violate the rules when they are:
+- hard to tell apart: a perceptual distance (CIEDE2000) below min_distance
+- supposed to contrast, but don't: at least half the lightness range apart
+  (like a color and its contrasting_shade), but with a (WCAG 2) contrast ratio
+  below min_contrast
+
+Distances & contrast ratios of all pairs form (upper triangular) matrices, which
+are computed in blocks of rows from columns of precomputed values per color
+(CIELAB, chroma, luminance), without any Color objects involved. Only one block
+is kept in memory at a time, however large the palette. That bounds the memory
+use, but isn't vectorized: (without NumPy) every pair still takes a Python call
+of the formula, so the time grows quadratically with the size of the palette.
+
+>>> from kleur import Colors
+>>> grid = PaletteGrid.from_palette(Colors, [s / 10 for s in range(1, 10)], [0.5, 1])
+>>> len(grid)
+207
+>>> [(v.rule, v.entry[0], v.other[0], round(v.value, 2)) for v in audit(grid)]
+[('distance', 'orange-v050-090', 'brown-v050-090', 1.95)]
+>>> strict = [v for v in audit(grid, min_contrast=7) if v.rule == "contrast"]
+>>> len(strict), [(v.entry[0], v.other[0], round(v.value, 2)) for v in strict[:1]]
+(2116, [('grey-010', 'grey-060', 5.47)])
+"""
+
+from array import array
+from math import atan2, cbrt, cos, degrees, exp, hypot, radians, sin, sqrt
+from typing import TYPE_CHECKING, NamedTuple
+
+from based_utils.class_utils import get_class_vars
+
+from .arrays import ColorArray
+from .color import Color
+from .contrast import relative_luminance
+from .exporting import palette_swatches
+from .hsluv_engine import rgb_to_xyz
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from .color import RGB
+
+type Lab = tuple[float, float, float]
+
+# Pairs closer than this are hard to tell apart (a difference of 1 is just noticeable).
+MIN_DISTANCE = 2.0
+# Minimum for large text & UI components (WCAG 2 AA).
+MIN_CONTRAST = 3.0
+# Lightness difference from which on colors are supposed to contrast.
+_CONTRAST_GAP = 0.5
+# Number of matrix rows computed at a time.
+_BLOCK_SIZE = 64
+
+_WHITE = rgb_to_xyz((1.0, 1.0, 1.0))
+_DELTA = 6 / 29
+_POW7_25 = 25**7
+
+
+def _f(t: float) -> float:
+    return cbrt(t) if t > _DELTA**3 else t / (3 * _DELTA**2) + 4 / 29
+
+
+def lab(rgb: RGB) -> Lab:
+    """
+    CIELAB (D65) values of an (8-bit) RGB color.
+
+    >>> [round(v, 2) for v in lab((255, 136, 0))]
+    [68.66, 38.84, 74.98]
+    """
+    r, g, b = rgb
+    xyz = rgb_to_xyz((r / 255, g / 255, b / 255))
+    fx, fy, fz = (_f(v / w) for v, w in zip(xyz, _WHITE, strict=True))
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _ciede2000(  # noqa: PLR0913
+    l1: float,
+    a1: float,
+    b1: float,
+    c1: float,
+    l2: float,
+    a2: float,
+    b2: float,
+    c2: float,
+) -> float:
+    c_mean7 = ((c1 + c2) / 2) ** 7
+    g = 1.5 - 0.5 * sqrt(c_mean7 / (c_mean7 + _POW7_25))
+    a1, a2 = a1 * g, a2 * g
+    c1, c2 = hypot(a1, b1), hypot(a2, b2)
+    h1 = degrees(atan2(b1, a1)) % 360 if c1 else 0
+    h2 = degrees(atan2(b2, a2)) % 360 if c2 else 0
+
+    dh = h2 - h1
+    h_sum = h1 + h2
+    if not c1 * c2:
+        dh, h_mean = 0, h_sum
+    elif abs(dh) <= 180:  # noqa: PLR2004
+        h_mean = h_sum / 2
+    else:
+        dh += -360 if dh > 0 else 360
+        h_mean = (h_sum + 360) / 2 if h_sum < 360 else (h_sum - 360) / 2  # noqa: PLR2004
+    dl, dc = l2 - l1, c2 - c1
+    dh_big = 2 * sqrt(c1 * c2) * sin(radians(dh) / 2)
+
+    l_mean50_2 = ((l1 + l2) / 2 - 50) ** 2
+    c_mean = (c1 + c2) / 2
+    t = (
+        1
+        - 0.17 * cos(radians(h_mean - 30))
+        + 0.24 * cos(radians(2 * h_mean))
+        + 0.32 * cos(radians(3 * h_mean + 6))
+        - 0.20 * cos(radians(4 * h_mean - 63))
+    )
+    c_mean7 = c_mean**7
+    r_c = 2 * sqrt(c_mean7 / (c_mean7 + _POW7_25))
+    r_t = -sin(radians(60 * exp(-(((h_mean - 275) / 25) ** 2)))) * r_c
+    s_l = 1 + 0.015 * l_mean50_2 / sqrt(20 + l_mean50_2)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+    x, y, z = dl / s_l, dc / s_c, dh_big / s_h
+    return sqrt(x * x + y * y + z * z + r_t * y * z)
+
+
+def ciede2000(lab1: Lab, lab2: Lab) -> float:
+    """
+    Perceptual distance between two CIELAB colors (CIEDE2000 color difference).
+
+    Test data by Sharma, Wu & Dalal (2005):
+    >>> round(ciede2000((50, 2.6772, -79.7751), (50, 0, -82.7485)), 4)
+    2.0425
+    >>> round(ciede2000((50, 0, 0), (50, -1, 2)), 4)
+    2.3669
+    >>> round(ciede2000((50, 2.5, 0), (73, 25, -18)), 4)
+    27.1492
+    >>> round(ciede2000((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514)), 4)
+    0.9082
+    """
+    (l1, a1, b1), (l2, a2, b2) = lab1, lab2
+    return _ciede2000(l1, a1, b1, hypot(a1, b1), l2, a2, b2, hypot(a2, b2))
+
+
+class Block(NamedTuple):
+    rows: range
+    # Per row i: values for all pairs (i, j) with j > i.
+    distances: list[array[float]]
+    contrast_ratios: list[array[float]]
+
+
+class Violation(NamedTuple):
+    rule: str  # "distance" or "contrast"
+    value: float
+    entry: tuple[str, Color]
+    other: tuple[str, Color]
+
+
+class PaletteGrid:
+    """Named colors, along with columns of the values needed to compare them."""
+
+    def __init__(self, entries: Iterable[tuple[str, Color]]) -> None:
+        self.entries = list(entries)
+        colors = ColorArray.from_colors(color for _, color in self.entries)
+        rgbs = colors.as_rgb
+        self._lightnesses = colors.lightnesses
+        self._l, self._a, self._b = array("d"), array("d"), array("d")
+        for li, a, b in map(lab, rgbs):
+            self._l.append(li)
+            self._a.append(a)
+            self._b.append(b)
+        self._chromas = array("d", map(hypot, self._a, self._b))
+        self._luminances = array("d", map(relative_luminance, rgbs))
+
+    @classmethod
+    def from_palette(
+        cls, palette_cls: type, shades: Sequence[float], vibrances: Sequence[float]
+    ) -> PaletteGrid:
+        """Grey & the colors of a palette class in all shades & vibrances."""
+        colors = get_class_vars(palette_cls, value_type=Color)
+        swatches = palette_swatches(colors, shades, vibrances)
+        return cls((f"{g}-{n}", c) for g, n, c in swatches)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def distances(self, i: int) -> array[float]:
+        """Distances (CIEDE2000) between entry i and all entries after it."""
+        ls, as_, bs, cs = self._l, self._a, self._b, self._chromas
+        l1, a1, b1, c1 = ls[i], as_[i], bs[i], cs[i]
+        j = i + 1
+        return array(
+            "d",
+            [
+                _ciede2000(l1, a1, b1, c1, l2, a2, b2, c2)
+                for l2, a2, b2, c2 in zip(ls[j:], as_[j:], bs[j:], cs[j:], strict=True)
+            ],
+        )
+
+    def contrast_ratios(self, i: int) -> array[float]:
+        """Contrast ratios between entry i and all entries after it."""
+        y1 = self._luminances[i] + 0.05
+        return array(
+            "d",
+            [
+                max(y1, y2) / min(y1, y2)
+                for y2 in (y + 0.05 for y in self._luminances[i + 1 :])
+            ],
+        )
+
+    def blocks(self, size: int = _BLOCK_SIZE) -> Iterator[Block]:
+        """Distance & contrast matrices, computed (and yielded) a few rows at a time."""
+        for start in range(0, len(self), size):
+            rows = range(start, min(start + size, len(self)))
+            yield Block(
+                rows,
+                [self.distances(i) for i in rows],
+                [self.contrast_ratios(i) for i in rows],
+            )
+
+    def supposed_to_contrast(self, i: int, j: int) -> bool:
+        """Whether entries i & j are at least half the lightness range apart."""
+        gap = abs(self._lightnesses[i] - self._lightnesses[j])
+        return gap > _CONTRAST_GAP - 1e-9
+
+
+def audit(
+    grid: PaletteGrid,
+    *,
+    min_distance: float = MIN_DISTANCE,
+    min_contrast: float = MIN_CONTRAST,
+    block_size: int = _BLOCK_SIZE,
+) -> Iterator[Violation]:
+    """
+    Find all pairs of colors in the grid that violate the rules.
+
+    :param grid: colors to check
+    :param min_distance: minimum perceptual distance (CIEDE2000) between any pair
+    :param min_contrast: minimum contrast ratio of pairs that are supposed to contrast
+    :param block_size: number of matrix rows computed at a time
+    :return: violations, ordered by (the first color of) their pairs
+    """
+    entries = grid.entries
+    for block in grid.blocks(block_size):
+        rows = zip(block.rows, block.distances, block.contrast_ratios, strict=True)
+        for i, distances, ratios in rows:
+            for j, (d, r) in enumerate(zip(distances, ratios, strict=True), i + 1):
+                if d < min_distance:
+                    yield Violation("distance", d, entries[i], entries[j])
+                if r < min_contrast and grid.supposed_to_contrast(i, j):
+                    yield Violation("contrast", r, entries[i], entries[j])
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class LRUCache[K: Hashable, V]:
+    """
+    Bounded cache, evicting the least recently used entries when full.
+
+    Safe to share between threads: the bookkeeping is done under a lock, but values
+    are computed outside of it (so a value might be computed twice by racing threads).
+
+    >>> cache = LRUCache[int, int](max_size=2)
+    >>> [cache.get(n, lambda n: n * n) for n in [1, 2, 1, 3, 2]]
+    [1, 4, 1, 9, 4]
+    >>> cache.stats
+    CacheStats(hits=1, misses=4, evictions=2, size=2, max_size=2)
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._max_size = max_size
+        self._hits = self._misses = self._evictions = 0
+        self._lock = Lock()
+
+    def get(self, key: K, compute: Callable[[K], V]) -> V:
+        entries = self._entries
+        with self._lock:
+            try:
+                value = entries[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                entries.move_to_end(key)
+                return value
+        value = compute(key)
+        with self._lock:
+            entries[key] = value
+            self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def resize(self, max_size: int) -> None:
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._max_size,
+            )
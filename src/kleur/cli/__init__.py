@@ -1,8 +1,86 @@
-from based_utils.cli import run_command
+import os
+import sys
+from argparse import ArgumentParser
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-from .palette_gen import PaletteGenerator
-from .shades_gen import ShadesGenerator
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from collections.abc import Collection
+
+    from based_utils.cli import ArgsParser
+
+# Subcommands & the classes implementing them (module, class name).
+_COMMANDS = {
+    "palette": ("palette_gen", "PaletteGenerator"),
+    "shades": ("shades_gen", "ShadesGenerator"),
+    "match": ("match_gen", "MatchGenerator"),
+    "extract": ("extract_gen", "ExtractGenerator"),
+    "audit": ("audit_gen", "AuditGenerator"),
+    "rgb-table": ("rgb_table_gen", "RgbTableGenerator"),
+    "serve": ("serve_gen", "ServeGenerator"),
+}
+
+
+def socket_path() -> str:
+    """Socket of the daemon (kleur serve), in a directory private to the user."""
+    if path := os.environ.get("KLEUR_SOCKET"):
+        return path
+    if not (runtime_dir := os.environ.get("XDG_RUNTIME_DIR")):
+        # Only imported when needed, as every command checks for a daemon.
+        from tempfile import gettempdir  # noqa: PLC0415
+
+        runtime_dir = gettempdir()
+    # Not as a Path, as pathlib isn't needed otherwise (when no daemon is running).
+    return os.path.join(runtime_dir, f"kleur-{os.getuid()}", "daemon.sock")  # noqa: PTH118
+
+
+def _command_cls(name: str) -> type[ArgsParser]:
+    module, cls_name = _COMMANDS[name]
+    cls: type[ArgsParser] = getattr(import_module(f".{module}", __name__), cls_name)
+    return cls
+
+
+def parser(commands: Collection[str]) -> ArgumentParser:
+    """Parser for all subcommands, of which only the given ones are configured."""
+    p = ArgumentParser(prog="kleur")
+    p.add_argument(
+        "--stats",
+        action="store_true",
+        help="print call counts & timings of the hot paths, and output cache hits "
+        "(to stderr)",
+    )
+    subparsers = p.add_subparsers(required=True)
+    for name in _COMMANDS:
+        subparser = subparsers.add_parser(name)
+        if name in commands:
+            _command_cls(name)(subparser)
+    return p
+
+
+def run(args: Namespace) -> None:
+    if not args.stats:
+        args.func(args)
+        return
+
+    from kleur import instrumentation  # noqa: PLC0415
+
+    try:
+        with instrumentation.instrumented():
+            args.func(args)
+    finally:
+        # Also when the command exits with an error (e.g. kleur audit).
+        sys.stderr.writelines(f"{line}\n" for line in instrumentation.summary())
 
 
 def main() -> None:
-    run_command(PaletteGenerator, ShadesGenerator)
+    argv = sys.argv[1:]
+    # Only the module of the requested command is imported (and its arguments added).
+    command = next((arg for arg in argv if arg in _COMMANDS), None)
+    # When a daemon (kleur serve) is running, let it do the work.
+    if command and os.path.exists(socket_path()):  # noqa: PTH110
+        from .daemon import forward  # noqa: PLC0415
+
+        if (exit_code := forward(command, argv)) is not None:
+            sys.exit(exit_code)
+    run(parser([command] if command else []).parse_args(argv))
@@ -0,0 +1,93 @@
+import sys
+from typing import TYPE_CHECKING
+
+from based_utils.cli import (
+    ArgsParser,
+    CommandRunner,
+    check_integer_in_range,
+    write_lines,
+)
+
+from kleur import AltColors, Color, Colors, Highlighter
+from kleur.audit import MIN_CONTRAST, MIN_DISTANCE, PaletteGrid, audit
+from kleur.formatting import FAIL, OK, DiffRenderer
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator
+
+    from kleur.audit import Violation
+    from kleur.formatting import Cell
+
+
+def _cell(name: str, color: Color) -> Cell:
+    return Highlighter(color).cell(f" #{color.as_hex} {name} ")
+
+
+class _CommandRunner(CommandRunner):
+    def __init__(self, args: Namespace) -> None:
+        palette_cls = AltColors if args.alt_default_palette else Colors
+        ns, nv = args.number_of_shades, args.number_of_vibrances
+        shades = [s / (ns + 1) for s in range(1, ns + 1)]
+        vibrances = [v / nv for v in range(1, nv + 1)]
+        self._grid = PaletteGrid.from_palette(palette_cls, shades, vibrances)
+        self._min_distance: float = args.min_distance
+        self._min_contrast: float = args.min_contrast
+        self.violations = 0
+
+    def _rows(self, violations: Iterator[Violation]) -> Iterator[list[Cell]]:
+        for rule, value, (name, color), (other_name, other) in violations:
+            self.violations += 1
+            yield [
+                (f"{rule:<9}{value:>6.2f} ", None, None),
+                _cell(name, color),
+                (" ", None, None),
+                _cell(other_name, other),
+            ]
+
+    def run(self) -> Iterator[str]:
+        violations = audit(
+            self._grid, min_distance=self._min_distance, min_contrast=self._min_contrast
+        )
+        yield from DiffRenderer().render_rows(self._rows(violations))
+        n, pairs = self.violations, len(self._grid) * (len(self._grid) - 1) // 2
+        yield f"{FAIL if n else OK} {n} violations in {pairs} pairs of colors"
+
+
+class AuditGenerator(ArgsParser):
+    _name = "audit"
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        parser.add_argument(
+            "-a", "--alt-default-palette", action="store_true", default=False
+        )
+        parser.add_argument(
+            "-s", "--number-of-shades", type=check_integer_in_range(1, 99), default=9
+        )
+        parser.add_argument(
+            "-v", "--number-of-vibrances", type=check_integer_in_range(1, 99), default=2
+        )
+        parser.add_argument(
+            "--min-distance",
+            type=float,
+            default=MIN_DISTANCE,
+            help="minimum perceptual distance (CIEDE2000) between any pair",
+        )
+        parser.add_argument(
+            "--min-contrast",
+            type=float,
+            default=MIN_CONTRAST,
+            help="minimum contrast ratio of pairs that are supposed to contrast "
+            "(at least half the lightness range apart)",
+        )
+
+    def _runner_cls(self, _args: Namespace) -> type[_CommandRunner]:
+        return _CommandRunner
+
+    def _run_command(self, args: Namespace) -> None:
+        # As usual (see ArgsParser), but exiting with status 1 on any violations.
+        runner = self._runner_cls(args)(args)
+        write_lines(runner.run())
+        if runner.violations:
+            sys.exit(1)
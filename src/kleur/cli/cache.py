@@ -0,0 +1,156 @@
+"""
+Content-addressed on-disk cache of command outputs.
+
+Entries are keyed by a digest of the command, its (normalized) arguments and the
+kleur version, so unchanged invocations can reuse their earlier output without
+calculating any colors. The total size is bounded: when it grows beyond the limit,
+the least recently used entries (by modification time) are evicted.
+"""
+
+import hashlib
+import json
+import os
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING, NamedTuple
+
+from based_utils.data import try_convert
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+_DEFAULT_MAX_SIZE = 64 << 20  # bytes
+_SUFFIX = ".txt"
+
+
+def default_cache_dir() -> Path:
+    if path := os.environ.get("KLEUR_CACHE_DIR"):
+        return Path(path)
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_dir) / "kleur" / "outputs"
+
+
+def default_max_size() -> int:
+    """
+    Maximum total size of the cache in bytes (KLEUR_CACHE_SIZE, default 64 MiB).
+
+    Invalid (or negative) values are ignored:
+    >>> os.environ["KLEUR_CACHE_SIZE"] = "64M"
+    >>> default_max_size() == _DEFAULT_MAX_SIZE
+    True
+    >>> del os.environ["KLEUR_CACHE_SIZE"]
+    """
+    size = try_convert(int, os.environ.get("KLEUR_CACHE_SIZE", ""), default=-1)
+    return _DEFAULT_MAX_SIZE if size is None or size < 0 else size
+
+
+def _kleur_version() -> str:
+    try:
+        return version("kleur")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def cache_key(command: str, params: Mapping[str, object]) -> str:
+    """
+    Digest of a command invocation (including the kleur version).
+
+    The order of the parameters doesn't matter:
+    >>> ab, ba = {"a": 1, "b": "x"}, {"b": "x", "a": 1}
+    >>> cache_key("shades", ab) == cache_key("shades", ba)
+    True
+    >>> cache_key("shades", {"a": 1}) == cache_key("palette", {"a": 1})
+    False
+    """
+    data = {"kleur": _kleur_version(), "command": command, "params": params}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class CacheStats(NamedTuple):
+    entries: int
+    size: int
+    max_size: int
+
+
+class OutputCache:
+    r"""
+    Command outputs stored as files, named after their keys.
+
+    >>> from tempfile import TemporaryDirectory
+    >>> with TemporaryDirectory() as tmp:
+    ...     cache = OutputCache(Path(tmp), max_size=10)
+    ...     cache.put("a", "12345\n")
+    ...     cache.put("b", "67890\n")  # The cache is full now: a is evicted.
+    ...     cache.get("a"), cache.get("b"), cache.stats
+    (None, '67890\n', CacheStats(entries=1, size=6, max_size=10))
+    """
+
+    def __init__(self, directory: Path = None, max_size: int = None) -> None:
+        self._dir = directory or default_cache_dir()
+        self._max_size = default_max_size() if max_size is None else max_size
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            # Mark the entry as recently used.
+            path.touch()
+        except OSError:
+            return None
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Store an entry (atomically, so concurrent builds never see partial ones).
+
+        :raise OSError: when the entry could not be stored
+        """
+        self._dir.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self._dir, suffix=".tmp", delete=False
+        ) as f:
+            tmp = Path(f.name)
+            try:
+                f.write(text)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+                raise
+        try:
+            tmp.replace(self._path(key))
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """Entries (modification time, size, path), least recently used first."""
+        entries = []
+        for path in self._dir.glob(f"*{_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:  # Evicted by another process in the meantime
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        size = sum(s for _, s, _ in entries)
+        for _, s, path in entries:
+            if size <= self._max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= s
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+
+    @property
+    def stats(self) -> CacheStats:
+        entries = self._entries() if self._dir.is_dir() else []
+        return CacheStats(len(entries), sum(s for _, s, _ in entries), self._max_size)
@@ -0,0 +1,111 @@
+"""
+Client side of the kleur daemon (kleur serve), talking JSON over a Unix socket.
+
+Every request is a JSON object on a single line, answered by a single JSON line:
+- {"op": "palette" | "shades" | "match", "args": [...]}: run a command (as if
+  run in "cwd", in a terminal with "env" & "tty"), answered with its "exit" code,
+  "stdout" & "stderr"
+- {"op": "convert", "colors": ["7ab1e5", ...]}: hex values to HSLuv & RGB
+- {"op": "stats"}: latency percentiles (in milliseconds) of the requests per op
+
+Only the standard library is used here, so forwarding a command to the daemon
+takes (almost) no more time than starting the interpreter.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+from pathlib import Path
+from typing import Any
+
+from . import socket_path
+
+# Commands the daemon can run.
+FORWARDED = ("palette", "shades", "match")
+
+# Environment variables that determine the color depth (& color space) of the output.
+TERMINAL_ENV = (
+    "KLEUR_COLOR_DEPTH",
+    "KLEUR_COLOR_SPACE",
+    "NO_COLOR",
+    "CLICOLOR_FORCE",
+    "COLORTERM",
+    "TERM",
+)
+
+
+def default_socket_path() -> Path:
+    return Path(socket_path())
+
+
+def check_owner(path: Path) -> None:
+    """
+    Make sure that a socket belongs to the user (and not to some other user).
+
+    :raise PermissionError: when it doesn't
+    """
+    st = path.stat()
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(path)
+
+
+def request(payload: dict[str, Any], path: Path = None) -> dict[str, Any]:
+    """Send a request to the daemon and wait for its response."""
+    path = path or default_socket_path()
+    # Never send anything (like the cwd & environment) to a daemon of another user.
+    check_owner(path)
+    with socket.socket(socket.AF_UNIX) as s:
+        s.connect(str(path))
+        s.sendall(f"{json.dumps(payload)}\n".encode())
+        with s.makefile("rb") as f:
+            response: dict[str, Any] = json.loads(f.readline())
+    return response
+
+
+def _reads_stdin(command: str, argv: list[str]) -> bool:
+    if command == "match":
+        # Colors are read from stdin, unless given as arguments.
+        return sys.stdin is not None and not sys.stdin.isatty()
+    return "-" in argv or "--batch=-" in argv
+
+
+def forward(command: str, argv: list[str]) -> int | None:
+    """
+    Let the daemon run a command, if it is running (and the command allows it).
+
+    :return: exit code of the command (None: it should be run by this process)
+    """
+    path = default_socket_path()
+    if (
+        command not in FORWARDED
+        # Global options (like --stats) are only handled locally.
+        or argv.index(command)
+        # The daemon can't read our stdin.
+        or _reads_stdin(command, argv)
+        or not path.exists()
+    ):
+        return None
+
+    env = {k: v for k in TERMINAL_ENV if (v := os.environ.get(k)) is not None}
+    payload = {
+        "op": command,
+        "args": argv[1:],
+        "cwd": str(Path.cwd()),
+        "env": env,
+        "tty": sys.stdout.isatty(),
+    }
+    try:
+        response = request(payload, path)
+    except (OSError, ValueError):
+        # Not responding (e.g. a stale socket of a daemon that is gone),
+        # or not ours.
+        return None
+    if "error" in response:
+        # Not a request it could handle (e.g. from an incompatible version).
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    exit_code: int = response["exit"]
+    return exit_code
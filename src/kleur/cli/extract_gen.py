@@ -0,0 +1,94 @@
+import sys
+from argparse import ArgumentTypeError
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from based_utils.cli import check_integer_in_range
+
+from kleur import ColorHighlighter, Highlighter
+from kleur.extraction import extract_palette
+from kleur.formatting import DiffRenderer
+from kleur.images import read_rgb_chunks
+
+from .output import ExportingRunner, OutputArgsParser
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator
+
+    from kleur.exporting import Swatch
+    from kleur.extraction import DominantColor
+    from kleur.formatting import Cell
+
+
+class _CommandRunner(ExportingRunner):
+    def __init__(self, args: Namespace) -> None:
+        self._label: str = args.label
+        k, raw = args.number_of_colors, args.raw
+        source = "stdin" if args.image == "-" else args.image
+        try:
+            if args.image == "-":
+                self._colors = extract_palette(
+                    read_rgb_chunks(sys.stdin.buffer, raw=raw), k
+                )
+            else:
+                with Path(args.image).open("rb") as f:
+                    self._colors = extract_palette(read_rgb_chunks(f, raw=raw), k)
+        except OSError as e:
+            msg = f"can't read {source}: {e.strerror}"
+            raise ArgumentTypeError(msg) from e
+        except ValueError as e:
+            msg = f"{source}: {e}"
+            raise ArgumentTypeError(msg) from e
+
+    def _named(self) -> Iterator[tuple[str, DominantColor]]:
+        width = len(str(len(self._colors)))
+        for i, dominant in enumerate(self._colors, 1):
+            yield f"{i:0{width}}", dominant
+
+    def swatches(self) -> Iterator[Swatch]:
+        for name, (color, _) in self._named():
+            yield self._label, name, color
+
+    def _rows(self) -> Iterator[list[Cell]]:
+        for name, (color, share) in self._named():
+            yield [
+                (f"{self._label}-{name} ", None, None),
+                Highlighter(color).cell(f" #{color.as_hex} "),
+                (" ", None, None),
+                *ColorHighlighter(color).cells(),
+                (f" {share:6.1%}", None, None),
+            ]
+
+    def run(self) -> Iterator[str]:
+        return DiffRenderer().render_rows(self._rows())
+
+
+class ExtractGenerator(OutputArgsParser):
+    _name = "extract"
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        self._error = parser.error
+        parser.add_argument(
+            "image", nargs="?", default="-", help="PPM / PAM image (default: stdin)"
+        )
+        parser.add_argument("-l", "--label", type=str, default="color")
+        parser.add_argument(
+            "-k", "--number-of-colors", type=check_integer_in_range(1, 99), default=8
+        )
+        parser.add_argument(
+            "--raw",
+            action="store_true",
+            default=False,
+            help="image consists of raw RGB bytes (without header)",
+        )
+
+    def _run_command(self, args: Namespace) -> None:
+        try:
+            super()._run_command(args)
+        except ArgumentTypeError as e:  # Unreadable image
+            self._error(str(e))
+
+    def _runner_cls(self, _args: Namespace) -> type[ExportingRunner]:
+        return _CommandRunner
@@ -0,0 +1,106 @@
+import sys
+from functools import cache
+from typing import TYPE_CHECKING
+
+from based_utils.cli import check_integer_in_range
+
+from kleur import AltColors, Color, Colors, Highlighter
+from kleur.formatting import DiffRenderer
+from kleur.hex_parsing import parse_hexes
+from kleur.matching import PaletteIndex
+from kleur.spaces import color_space
+
+from .output import ExportingRunner, OutputArgsParser, check_hex
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator
+
+    from kleur.exporting import Swatch
+    from kleur.formatting import Cell
+    from kleur.matching import Match
+
+
+@cache
+def _palette_index(palette_cls: type, ns: int, nv: int, _space: str) -> PaletteIndex:
+    # Kept for later runs in the same process (e.g. when serving as a daemon),
+    # per color space (the colors of the palette depend on it).
+    if not ns:
+        return PaletteIndex.from_palette(palette_cls)
+    shades = [s / (ns + 1) for s in range(1, ns + 1)]
+    vibrances = [v / nv for v in range(1, nv + 1)]
+    return PaletteIndex.from_palette(palette_cls, shades, vibrances)
+
+
+class _CommandRunner(ExportingRunner):
+    def __init__(self, args: Namespace) -> None:
+        palette_cls = AltColors if args.alt_default_palette else Colors
+        ns, nv = args.number_of_shades, args.number_of_vibrances
+        self._index = _palette_index(palette_cls, ns, nv, color_space().name)
+        self._k: int = args.number_of_matches
+        if args.colors:
+            self._inputs = [Color.from_hex(v) for v in args.colors]
+        else:
+            # Parsed in bulk (batches of colors could be huge), skipping invalid ones.
+            parsed = parse_hexes(sys.stdin.buffer.read())
+            for offset, entry in parsed.errors:
+                sys.stderr.write(
+                    f"skipped invalid color at offset {offset}: {entry!r}\n"
+                )
+            self._inputs = list(parsed.colors)
+
+    def _matches(self) -> Iterator[tuple[Color, list[Match]]]:
+        matches = self._index.nearest_many(self._inputs, self._k)
+        return zip(self._inputs, matches, strict=True)
+
+    def swatches(self) -> Iterator[Swatch]:
+        for color, matches in self._matches():
+            for m in matches:
+                yield color.as_hex, m.name, m.color
+
+    def _rows(self) -> Iterator[list[Cell]]:
+        for color, matches in self._matches():
+            row = [Highlighter(color).cell(f" #{color.as_hex} ")]
+            for m in matches:
+                row += [
+                    (" ", None, None),
+                    Highlighter(m.color).cell(f" #{m.color.as_hex} {m.name} "),
+                    (f" ({m.distance:.2f})", None, None),
+                ]
+            yield row
+
+    def run(self) -> Iterator[str]:
+        return DiffRenderer().render_rows(self._rows())
+
+
+class MatchGenerator(OutputArgsParser):
+    _name = "match"
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        parser.add_argument(
+            "colors",
+            nargs="*",
+            type=check_hex,
+            metavar="HEX",
+            help="colors (default: read stdin)",
+        )
+        parser.add_argument(
+            "-a", "--alt-default-palette", action="store_true", default=False
+        )
+        parser.add_argument(
+            "-s",
+            "--number-of-shades",
+            type=check_integer_in_range(0, 99),
+            default=9,
+            help="0: only match the palette colors themselves",
+        )
+        parser.add_argument(
+            "-v", "--number-of-vibrances", type=check_integer_in_range(1, 99), default=2
+        )
+        parser.add_argument(
+            "-n", "--number-of-matches", type=check_integer_in_range(1, 99), default=1
+        )
+
+    def _runner_cls(self, _args: Namespace) -> type[ExportingRunner]:
+        return _CommandRunner
@@ -0,0 +1,134 @@
+import sys
+from abc import ABC, abstractmethod
+from argparse import ArgumentTypeError
+from pathlib import Path
+from string import hexdigits
+from typing import TYPE_CHECKING
+
+from based_utils.cli import ArgsParser, CommandRunner
+
+from kleur.color import normalize_rgb_hex
+from kleur.exporting import FORMATS, export
+from kleur.formatting import color_depth
+from kleur.spaces import SPACES, color_space, set_color_space
+
+from .cache import OutputCache, cache_key
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator, Mapping
+
+    from kleur.exporting import Swatch
+
+
+def check_hex(value: str | None) -> str | None:
+    """
+    Check an RGB hex argument (but keep it as it is).
+
+    >>> check_hex("#0af"), check_hex(None)
+    ('#0af', None)
+    >>> check_hex("orange")
+    Traceback (most recent call last):
+    ...
+    argparse.ArgumentTypeError: invalid color: 'orange'
+    """
+    if value is not None:
+        try:
+            valid = set(normalize_rgb_hex(value)) <= set(hexdigits)
+        except ValueError:
+            valid = False
+        if not valid:
+            msg = f"invalid color: {value!r}"
+            raise ArgumentTypeError(msg)
+    return value
+
+
+class ExportingRunner(CommandRunner, ABC):
+    @abstractmethod
+    def swatches(self) -> Iterator[Swatch]:
+        """Generate the colors, without any styling."""
+
+
+def _output_format(args: Namespace) -> str | None:
+    if args.format or not args.output:
+        return args.format
+    # Derive the format from the file extension (e.g. colors.scss), if possible.
+    suffix = args.output.suffix.removeprefix(".")
+    return suffix if suffix in FORMATS else "css"
+
+
+class OutputArgsParser(ArgsParser, ABC):
+    """
+    Command that writes its output lines as soon as they are generated.
+
+    Alternatively, the plain colors can be written in a machine-readable format.
+    """
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("-o", "--output", metavar="FILE", type=Path)
+        parser.add_argument(
+            "--space",
+            choices=SPACES,
+            help="color space of hue, saturation & lightness "
+            "(default: KLEUR_COLOR_SPACE or hsluv)",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            default=False,
+            help="don't use the output cache (KLEUR_CACHE_DIR)",
+        )
+
+    @abstractmethod
+    def _runner_cls(self, args: Namespace) -> type[ExportingRunner]: ...
+
+    def _cache_params(self, _args: Namespace) -> Mapping[str, object] | None:
+        """Return the normalized arguments that determine the output (if cacheable)."""
+        return None
+
+    def _output(self, args: Namespace, fmt: str | None) -> Iterator[str]:
+        runner = self._runner_cls(args)(args)
+        if fmt:
+            # No styling involved, so the whole block is generated at once.
+            yield f"{export(runner.swatches(), fmt)}\n"
+        else:
+            yield from (f"{line}\n" for line in runner.run())
+
+    def _cached_output(
+        self, args: Namespace, fmt: str | None, params: Mapping[str, object]
+    ) -> Iterator[str]:
+        # Styled output depends on the color depth of the terminal as well.
+        fmt_or_depth = fmt or color_depth().name
+        key = cache_key(
+            self._name, {**params, "format": fmt_or_depth, "space": color_space().name}
+        )
+        cache = OutputCache()
+        if (text := cache.get(key)) is None:
+            text = "".join(self._output(args, fmt))
+            status = "miss"
+            try:
+                cache.put(key, text)
+            except OSError as e:
+                # The output is there anyway, it just won't be reused later on.
+                status = f"miss, not stored ({e})"
+        else:
+            status = "hit"
+        if args.stats:
+            sys.stderr.write(f"output cache: {status} ({key[:12]}) {cache.stats}\n")
+        yield text
+
+    def _run_command(self, args: Namespace) -> None:
+        if args.space:
+            set_color_space(args.space)
+        fmt = _output_format(args)
+        if args.no_cache or (params := self._cache_params(args)) is None:
+            output = self._output(args, fmt)
+        else:
+            output = self._cached_output(args, fmt, params)
+        if args.output:
+            args.output.write_text("".join(output), encoding="utf-8")
+        else:
+            # Written as soon as they are generated (unless they come from the cache).
+            sys.stdout.writelines(output)
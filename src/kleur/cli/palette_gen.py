@@ -1,27 +1,29 @@
 from typing import TYPE_CHECKING
 
 from based_utils.class_utils import get_class_vars
-from based_utils.cli import (
-    ArgsParser,
-    CommandRunner,
-    check_integer_in_range,
-    parse_key_value_pair,
-)
+from based_utils.cli import check_integer_in_range, parse_key_value_pair
 from based_utils.data import try_convert
 from based_utils.interpol import LinearMapping
 
-from kleur import BLACK, GREY, WHITE, AltColors, Color, Colors, ColorStr, Highlighter, c
+from kleur import BLACK, GREY, WHITE, AltColors, Color, Colors, Highlighter, c
+from kleur.exporting import palette_swatches
+from kleur.formatting import DiffRenderer
+
+from .output import ExportingRunner, OutputArgsParser
 
 if TYPE_CHECKING:
     from argparse import ArgumentParser, Namespace
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from kleur.exporting import Swatch
+    from kleur.formatting import Cell
 
 
 def _perc(s: float) -> str:
     return f"{round(s * 100, 1):n}%"
 
 
-class _CommandRunner(CommandRunner):
+class _CommandRunner(ExportingRunner):
     def __init__(self, args: Namespace) -> None:
         ns, nv = args.number_of_shades, args.number_of_vibrances
         self._shades = [s / (ns + 1) for s in range(1, ns + 1)]
@@ -50,29 +52,29 @@ class _CommandRunner(CommandRunner):
         self._neutral_shade_lo, self._neutral_shade_hi = 0.6, 0.75
         self._shade_map = LinearMapping(self._neutral_shade_lo, self._neutral_shade_hi)
 
-    def _percentage_columns(self, v: float) -> Iterator[str]:
+    def _percentage_columns(self, v: float) -> Iterator[Cell]:
         cp, sm = self._percentage_color.saturated(v), self._shade_map
         c0 = cp.shade(self._neutral_shade_lo)
-        yield ColorStr(f" {_perc(v)}".ljust(self._label_length), c0.brighter(), c0)
+        yield f" {_perc(v)}".ljust(self._label_length), c0.brighter(), c0
 
         for s in self._shades:
-            yield ColorStr(" ", bg=cp.shade(s))
-            yield ColorStr(_perc(s).center(7), cp.shade(sm.value_at(s)))
+            yield " ", None, cp.shade(s)
+            yield _perc(s).center(7), cp.shade(sm.value_at(s)), None
 
-        yield ColorStr(" ", bg=WHITE)
+        yield " ", None, WHITE
 
-    def _color_columns(self, name: str, color: Color) -> Iterable[str]:
+    def _color_columns(self, name: str, color: Color) -> Iterable[Cell]:
         hue = f"{color.hue * 360:3.0f}" if color.saturation else ""
         c0 = color.shade(self._neutral_shade_lo)
-        yield ColorStr(f" {hue:>3} {name}".ljust(self._label_length), c0, BLACK)
+        yield f" {hue:>3} {name}".ljust(self._label_length), c0, BLACK
 
         for s in self._shades:
             k = color.shade(s)
-            yield Highlighter(k)(k.as_hex.center(8))
+            yield Highlighter(k).cell(k.as_hex.center(8))
 
-        yield ColorStr(" ", bg=WHITE)
+        yield " ", None, WHITE
 
-    def _rows(self) -> Iterator[Iterable[str]]:
+    def _rows(self) -> Iterator[Iterable[Cell]]:
         yield []
         yield self._percentage_columns(0)
         yield self._color_columns("grey", GREY)
@@ -83,12 +85,15 @@ class _CommandRunner(CommandRunner):
                 yield self._color_columns(name, k.saturated(v))
         yield []
 
+    def swatches(self) -> Iterator[Swatch]:
+        return palette_swatches(self._colors, self._shades, self._vibrances)
+
     def run(self) -> Iterator[str]:
-        for columns in self._rows():
-            yield "".join(columns)
+        # Adjacent cells often share colors, so only emit the changes in between.
+        return DiffRenderer().render_rows(self._rows())
 
 
-class PaletteGenerator(ArgsParser):
+class PaletteGenerator(OutputArgsParser):
     _name = "palette"
 
     def __init__(self, parser: ArgumentParser) -> None:
@@ -114,5 +119,16 @@ class PaletteGenerator(ArgsParser):
             "-v", "--number-of-vibrances", type=check_integer_in_range(1, 99), default=2
         )
 
-    def _runner_cls(self, _args: Namespace) -> type[CommandRunner]:
+    def _runner_cls(self, _args: Namespace) -> type[ExportingRunner]:
         return _CommandRunner
+
+    def _cache_params(self, args: Namespace) -> Mapping[str, object] | None:
+        # The default palette is only used when merging, or without custom colors.
+        default = args.merge_with_default_palette or not args.colors
+        return {
+            "colors": args.colors,
+            "default_palette": default
+            and ("alt" if args.alt_default_palette else "std"),
+            "number_of_shades": args.number_of_shades,
+            "number_of_vibrances": args.number_of_vibrances,
+        }
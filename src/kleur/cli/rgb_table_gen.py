@@ -0,0 +1,41 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from based_utils.cli import ArgsParser, CommandRunner
+
+from kleur.formatting import FAIL, OK
+from kleur.rgb_table import RgbTable, build_rgb_table, default_rgb_table_path
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator
+
+
+class _CommandRunner(CommandRunner):
+    def __init__(self, args: Namespace) -> None:
+        self._path: Path = args.output or default_rgb_table_path()
+        self._verify_only = args.verify
+
+    def run(self) -> Iterator[str]:
+        if not self._verify_only:
+            build_rgb_table(self._path)
+            yield f"Built RGB -> HSLuv table: {self._path}"
+        try:
+            table = RgbTable(self._path)
+        except (OSError, ValueError):
+            yield f"{FAIL} No valid RGB -> HSLuv table found: {self._path}"
+            return
+        with table:
+            yield f"{OK if table.verify() else FAIL} Checksum verified: {self._path}"
+
+
+class RgbTableGenerator(ArgsParser):
+    _name = "rgb-table"
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        parser.add_argument("-o", "--output", type=Path)
+        parser.add_argument("--verify", action="store_true", default=False)
+
+    def _runner_cls(self, _args: Namespace) -> type[CommandRunner]:
+        return _CommandRunner
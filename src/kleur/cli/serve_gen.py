@@ -0,0 +1,337 @@
+import asyncio
+import json
+import os
+import sys
+import traceback
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager, redirect_stderr, redirect_stdout, suppress
+from io import StringIO
+from math import ceil
+from pathlib import Path
+from stat import S_ISVTX
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from based_utils.cli import ArgsParser, CommandRunner
+
+from kleur.color import normalize_rgb_hex
+from kleur.formatting import color_depth, detect_color_depth, set_color_depth
+from kleur.spaces import HSLUV, SPACES, color_space, set_color_space
+
+from . import parser, run
+from .daemon import FORWARDED, default_socket_path, request
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from collections.abc import Iterator, Sequence
+
+# Number of (most recent) latencies per op, used for the percentiles.
+_WINDOW = 10000
+# Maximum length of a request line (in bytes).
+_MAX_REQUEST = 1 << 24
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """
+    Nearest-rank percentile of (sorted) values.
+
+    >>> [percentile(list(range(1, 201)), p) for p in (50, 90, 99, 100)]
+    [100, 180, 198, 200]
+    """
+    return sorted_values[max(ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+class Latencies:
+    """Latencies of the requests per op, of which the percentiles are reported."""
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._seconds: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=_WINDOW)
+        )
+
+    def add(self, op: str, seconds: float) -> None:
+        self._counts[op] += 1
+        self._seconds[op].append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for op, seconds in sorted(self._seconds.items()):
+            ms = sorted(s * 1000 for s in seconds)
+            stats: dict[str, float] = {"requests": self._counts[op]}
+            result[op] = stats | {
+                f"p{p}": round(percentile(ms, p), 3) for p in (50, 90, 99, 100)
+            }
+        return result
+
+
+def _summary_lines(latencies: dict[str, dict[str, float]]) -> Iterator[str]:
+    for op, stats in latencies.items():
+        n, *ps = stats.items()
+        percentiles = "  ".join(f"{p} {v:8.3f}ms" for p, v in ps)
+        yield f"{op:<8} {n[1]:>8} requests  {percentiles}"
+
+
+# Types of the fields of requests (all optional, except op).
+_FIELD_TYPES = {
+    "op": str,
+    "args": list,
+    "cwd": str,
+    "env": dict,
+    "tty": bool,
+    "colors": list,
+}
+
+
+def _validated(req: object) -> dict[str, Any]:
+    """
+    Check the types of the fields of a request (before acting on any of them).
+
+    >>> _validated({"op": "convert", "colors": ["f80", 3]})
+    Traceback (most recent call last):
+    ...
+    TypeError: colors
+    """
+    if not isinstance(req, dict) or "op" not in req:
+        raise TypeError(req)
+    for field, field_type in _FIELD_TYPES.items():
+        if field in req and not isinstance(req[field], field_type):
+            raise TypeError(field)
+    env = req.get("env", {})
+    for field, values in (
+        ("args", req.get("args", [])),
+        ("colors", req.get("colors", [])),
+        ("env", [*env, *env.values()]),
+    ):
+        if not all(isinstance(v, str) for v in values):
+            raise TypeError(field)
+    return req
+
+
+@contextmanager
+def _settings_restored() -> Iterator[None]:
+    """Restore the color depth & space (which are set per command) afterwards."""
+    saved = {k: os.environ.get(k) for k in ("KLEUR_COLOR_DEPTH", "KLEUR_COLOR_SPACE")}
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        color_depth.cache_clear()
+        color_space.cache_clear()
+
+
+def _converted(rgb_hex: str) -> dict[str, Any]:
+    # Always in HSLuv: the color space might be switched by a command meanwhile.
+    rgb_hex = normalize_rgb_hex(rgb_hex)
+    rgb = bytes.fromhex(rgb_hex)
+    h, s, li = HSLUV.from_rgb((rgb[0] / 255, rgb[1] / 255, rgb[2] / 255))
+    return {"hex": rgb_hex, "hsluv": [h / 360, s / 100, li / 100], "rgb": list(rgb)}
+
+
+class Server:
+    """Handles requests in one process, so caches stay warm between them."""
+
+    def __init__(self) -> None:
+        self._parser = parser(FORWARDED)
+        self.latencies = Latencies()
+        # Commands change process-wide state (cwd, color depth & space, stdout),
+        # so only one of them runs at a time.
+        self._command_lock = Lock()
+
+    def _run_command(self, op: str, req: dict[str, Any]) -> dict[str, Any]:
+        with self._command_lock, _settings_restored():
+            return self._run_command_locked(op, req)
+
+    def _run_command_locked(self, op: str, req: dict[str, Any]) -> dict[str, Any]:
+        tty, env = bool(req.get("tty")), req.get("env", {})
+        set_color_depth(detect_color_depth(env, tty=tty))
+        # Caches are kept per color space, so switching back and forth is cheap.
+        space = env.get("KLEUR_COLOR_SPACE", "").lower()
+        set_color_space(space if space in SPACES else "hsluv")
+        stdout, stderr, exit_code = StringIO(), StringIO(), 0
+        cwd = Path.cwd()
+        try:
+            os.chdir(req.get("cwd", cwd))
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                run(self._parser.parse_args([op, *req.get("args", [])]))
+        except SystemExit as e:  # e.g. invalid arguments or --help
+            exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except OSError as e:  # e.g. a cwd that doesn't exist (anymore)
+            stderr.write(f"kleur {op}: error: {e}\n")
+            exit_code = 1
+        except Exception:  # noqa: BLE001 (the daemon should survive any command)
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            os.chdir(cwd)
+        return {
+            "exit": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    def _dispatch(self, op: str, req: dict[str, Any]) -> dict[str, Any]:
+        if op in FORWARDED:
+            return self._run_command(op, req)
+        match op:
+            case "convert":
+                return {"colors": [_converted(h) for h in req["colors"]]}
+            case "stats":
+                return {"latencies": self.latencies.summary()}
+            case _:
+                raise ValueError(op)
+
+    def handle(self, line: bytes) -> dict[str, Any]:
+        """
+        Handle a single request.
+
+        >>> server = Server()
+        >>> [converted] = server.handle(b'{"op": "convert", "colors": ["f80"]}')[
+        ...     "colors"
+        ... ]
+        >>> converted["hex"], converted["rgb"]
+        ('ff8800', [255, 136, 0])
+        >>> shades = (
+        ...     b'{"op": "shades", "args": ["-c", "f80", "--no-cache"], "tty": true}'
+        ... )
+        >>> server.handle(shades)["stdout"].startswith("/*")
+        True
+        >>> server.handle(b'{"op": "shades", "args": ["--bogus"]}')["exit"]
+        2
+        >>> bad_cwd = b'{"op": "shades", "args": ["-c", "f80"], "cwd": "/nope"}'
+        >>> response = server.handle(bad_cwd)
+        >>> response["exit"], response["stdout"]
+        (1, '')
+        >>> print(response["stderr"], end="")
+        kleur shades: error: [Errno 2] No such file or directory: '/nope'
+        >>> server.handle(b'{"op": "bogus"}')
+        {'error': 'ValueError: bogus', 'exit': 1}
+        >>> server.handle(b'{"op": "convert", "colors": [7]}')
+        {'error': 'TypeError: colors', 'exit': 1}
+        >>> list(server.latencies.summary())
+        ['convert', 'invalid', 'shades']
+        """
+        start, op = perf_counter(), "invalid"
+        try:
+            req = _validated(json.loads(line))
+            response = self._dispatch(req["op"], req)
+            op = req["op"]
+        except (KeyError, TypeError, ValueError) as e:
+            response = {"error": f"{type(e).__name__}: {e}", "exit": 1}
+        self.latencies.add(op, perf_counter() - start)
+        return response
+
+    async def handle_async(self, line: bytes) -> dict[str, Any]:
+        """Handle a request, of which commands run in a worker thread."""
+        try:
+            op = json.loads(line)["op"]
+        except (KeyError, TypeError, ValueError):
+            op = None
+        if op in FORWARDED:
+            # Other clients (e.g. conversions or stats) are served meanwhile.
+            return await asyncio.to_thread(self.handle, line)
+        return self.handle(line)
+
+    async def _client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                response = await self.handle_async(line)
+                writer.write(f"{json.dumps(response)}\n".encode())
+                await writer.drain()
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self, path: Path) -> None:
+        # Only accessible by the user, right from the start.
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self._client, path, limit=_MAX_REQUEST
+            )
+        finally:
+            os.umask(umask)
+        path.chmod(0o600)
+        async with server:
+            await server.serve_forever()
+
+
+def _private_dir(path: Path) -> bool:
+    """
+    Create the directory of the socket (only accessible by the user).
+
+    An existing directory should belong to the user, or be a shared system
+    directory (like /tmp) in which users can't remove each other's files.
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = path.stat()
+    return st.st_uid == os.getuid() or (st.st_uid == 0 and bool(st.st_mode & S_ISVTX))
+
+
+def _is_running(path: Path) -> bool:
+    try:
+        request({"op": "stats"}, path)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+class _CommandRunner(CommandRunner):
+    def __init__(self, args: Namespace) -> None:
+        self._path: Path = args.socket or default_socket_path()
+        self._status_only = args.status
+
+    def _serve(self) -> Iterator[str]:
+        if not _private_dir(self._path.parent):
+            yield f"Not owned by the user: {self._path.parent}"
+            return
+        if _is_running(self._path):
+            yield f"Already running: {self._path}"
+            return
+        # Left behind by a daemon that didn't stop cleanly.
+        self._path.unlink(missing_ok=True)
+        # Commands shouldn't wait for input from the terminal of the daemon.
+        sys.stdin = StringIO()
+        server = Server()
+        yield f"Serving on {self._path} (stop with Ctrl+C)"
+        try:
+            asyncio.run(server.serve(self._path))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._path.unlink(missing_ok=True)
+        yield from _summary_lines(server.latencies.summary())
+
+    def run(self) -> Iterator[str]:
+        if not self._status_only:
+            return self._serve()
+        if not _is_running(self._path):
+            return iter([f"Not running: {self._path}"])
+        return _summary_lines(request({"op": "stats"}, self._path)["latencies"])
+
+
+class ServeGenerator(ArgsParser):
+    _name = "serve"
+
+    def __init__(self, parser: ArgumentParser) -> None:
+        super().__init__(parser)
+        parser.add_argument(
+            "--socket", type=Path, help="Unix socket path (default: KLEUR_SOCKET)"
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            default=False,
+            help="show request latencies of the running daemon",
+        )
+
+    def _runner_cls(self, _args: Namespace) -> type[CommandRunner]:
+        return _CommandRunner
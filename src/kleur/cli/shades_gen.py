@@ -1,48 +1,81 @@
+import csv
+import sys
 from abc import ABC, abstractmethod
+from argparse import ArgumentTypeError, Namespace
+from concurrent import futures
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from based_utils.cli import ArgsParser, check_integer_in_range
-from based_utils.cli.args import CommandRunner
+from based_utils.cli import check_integer_in_range
 from based_utils.interpol import LinearMapping, mapped
 
-from kleur import Color, ColorHighlighter, Highlighter, blend_colors
+from kleur import Color, ColorHighlighter, Gradient, Highlighter, normalize_rgb_hex
+from kleur.formatting import DiffRenderer, color_depth, set_color_depth
+
+from .output import ExportingRunner, OutputArgsParser, check_hex
 
 if TYPE_CHECKING:
-    from argparse import ArgumentParser, Namespace
-    from collections.abc import Iterator
+    from argparse import ArgumentParser
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+
+    from kleur.exporting import Swatch
+    from kleur.formatting import Cell
 
 
 CP = Color.Props
 
 
-def _input_comment(color: Color) -> str:
-    return f"{Highlighter(color)(f' #{color.as_hex}; ')} {ColorHighlighter(color)()}"
+def _input_comment(label: str, color: Color) -> list[Cell]:
+    hl = Highlighter(color).cell(f" #{color.as_hex}; ")
+    return [
+        (label, None, None),
+        hl,
+        (" ", None, None),
+        *ColorHighlighter(color).cells(),
+    ]
 
 
-class _CommandRunner(CommandRunner, ABC):
+class _CommandRunner(ExportingRunner, ABC):
     def __init__(self, args: Namespace) -> None:
         self._label, self._include_input = (args.label, args.include_input_shades)
         ibw, ns = (args.include_black_and_white, args.number_of_shades + 1)
         self._shades = [s / ns for s in range(*((0, ns + 1) if ibw else (1, ns)))]
 
     @abstractmethod
-    def _comment_lines(self) -> Iterator[str]: ...
+    def _comment_lines(self) -> Iterator[list[Cell]]: ...
 
     @abstractmethod
     def _colors(self) -> Iterator[tuple[Color, CP]]: ...
 
+    def _shades_by_name(self) -> list[tuple[str, tuple[Color, CP]]]:
+        # This intermediate dict will take care of duplicates as a nice side effect. 🫠
+        colors = {f"{c.lightness * 100:03.0f}": (c, hp) for c, hp in self._colors()}
+        return sorted(colors.items())
+
+    def swatches(self) -> Iterator[Swatch]:
+        for shade, (color, _) in self._shades_by_name():
+            yield self._label, shade, color
+
     def run(self) -> Iterator[str]:
-        yield "/*"
+        return DiffRenderer().render_rows(self._rows())
+
+    def _rows(self) -> Iterator[list[Cell]]:
+        yield [("/*", None, None)]
         yield from self._comment_lines()
-        yield "*/"
+        yield [("*/", None, None)]
 
-        # This intermediate dict will take care of duplicates as a nice side effect. 🫠
-        colors = {f"{c.lightness * 100:03.0f}": (c, hp) for c, hp in self._colors()}
-        for shade, (color, hl_ps) in sorted(colors.items()):
+        for shade, (color, hl_ps) in self._shades_by_name():
             hl, hl_c, is_hl = Highlighter(color), ColorHighlighter(color), bool(hl_ps)
-            hex_str = f"{hl(' ')}{hl(f'#{color.as_hex};', inverted=is_hl)}{hl(' ')}"
-            css_var = f"{hl(f'--{self._label}-{shade}', enabled=is_hl)}:{hex_str}"
-            yield f"{css_var}/* {hl_c(hl_ps, enable_bounds_highlights=is_hl)} */"
+            yield [
+                hl.cell(f"--{self._label}-{shade}", enabled=is_hl),
+                (":", None, None),
+                hl.cell(" "),
+                hl.cell(f"#{color.as_hex};", inverted=is_hl),
+                hl.cell(" "),
+                ("/* ", None, None),
+                *hl_c.cells(hl_ps, enable_bounds_highlights=is_hl),
+                (" */", None, None),
+            ]
 
 
 class RunnerOneColor(_CommandRunner):
@@ -50,8 +83,8 @@ class RunnerOneColor(_CommandRunner):
         super().__init__(args)
         self._input = Color.from_hex(args.color1)
 
-    def _comment_lines(self) -> Iterator[str]:
-        yield f"Based on: {_input_comment(self._input)}"
+    def _comment_lines(self) -> Iterator[list[Cell]]:
+        yield _input_comment("Based on: ", self._input)
 
     def _colors(self) -> Iterator[tuple[Color, CP]]:
         """Generate shades of a color."""
@@ -68,10 +101,10 @@ class RunnerTwoColors(_CommandRunner):
         c1, c2 = Color.from_hex(args.color1), Color.from_hex(args.color2)
         self._dark, self._bright = sorted(c1.align_with(c2))
 
-    def _comment_lines(self) -> Iterator[str]:
-        yield "Based on:"
-        yield f" Darkest:   {_input_comment(self._dark)}"
-        yield f" Brightest: {_input_comment(self._bright)}"
+    def _comment_lines(self) -> Iterator[list[Cell]]:
+        yield [("Based on:", None, None)]
+        yield _input_comment(" Darkest:   ", self._dark)
+        yield _input_comment(" Brightest: ", self._bright)
 
     def _colors(self) -> Iterator[tuple[Color, CP]]:
         """
@@ -91,23 +124,20 @@ class RunnerTwoColors(_CommandRunner):
         old_colors = self._dark, self._bright
 
         li_old = [c.lightness for c in old_colors]
-        sm_old = LinearMapping(*li_old)
 
         li_new = [mapped(self._dynamic_range, (li, e)) for e, li in enumerate(li_old)]
         sm_new = LinearMapping(*li_new)
 
-        blend_old = blend_colors(*old_colors)
-        colors_l = [blend_old(sm_new.position_of(li)).shade(li) for li in li_old]
-        blend_new = blend_colors(*colors_l)
+        gradient_old = Gradient.between(*old_colors)
+        colors_l = [gradient_old(sm_new.position_of(li)).shade(li) for li in li_old]
+        # Positioning the stops at the original lightnesses will map each lightness
+        # to its position relative to the input colors.
+        gradient = Gradient(zip(li_old, colors_l, strict=True))
 
-        def blend(lightness: float) -> Color:
-            return blend_new(sm_old.position_of(lightness))
-
-        for s in self._shades:
-            yield blend(s), CP.NONE
+        yield from ((c, CP.NONE) for c in gradient.sample(self._shades))
 
         if self._include_input:
-            colors_hs = [blend(li) for li in li_new]
+            colors_hs = gradient.sample(li_new)
             for c_l, c_hs in zip(colors_l, colors_hs, strict=True):
                 if c_l.as_rgb == c_hs.as_rgb:
                     yield c_l, CP.ALL
@@ -116,16 +146,185 @@ class RunnerTwoColors(_CommandRunner):
                     yield c_hs, CP.NO_L
 
 
-class ShadesGenerator(ArgsParser):
+_check_number_of_shades = check_integer_in_range(1, 99)
+_check_dynamic_range = check_integer_in_range(0, 100)
+
+_SPEC_FIELDS = ["label", "color1", "color2", "number_of_shades", "dynamic_range"]
+
+
+def _spec_value(
+    check: Callable[[str], int], value: str | None, default: int, description: str
+) -> int:
+    if not value:
+        return default
+    try:
+        return check(value)
+    except ValueError:
+        msg = f"invalid {description}: {value!r}"
+        raise ArgumentTypeError(msg) from None
+
+
+def _parse_spec(line: str, defaults: Namespace) -> Namespace:
+    [row] = csv.reader([line])
+    if not 1 < len(row) <= len(_SPEC_FIELDS):
+        msg = f"expected 2 to {len(_SPEC_FIELDS)} fields, got {len(row)}"
+        raise ArgumentTypeError(msg)
+    spec = dict(zip(_SPEC_FIELDS, [f.strip() for f in row], strict=False))
+    ns, dr = spec.get("number_of_shades"), spec.get("dynamic_range")
+    # Specs are sent to worker processes, so only plain values are included
+    # (not the function handling the command, which refers to the parser).
+    plain = {k: v for k, v in vars(defaults).items() if k != "func"}
+    return Namespace(
+        **plain
+        | {
+            "label": spec["label"] or defaults.label,
+            "color1": check_hex(spec["color1"]),
+            "color2": check_hex(spec.get("color2") or defaults.color2),
+            "number_of_shades": _spec_value(
+                _check_number_of_shades,
+                ns,
+                defaults.number_of_shades,
+                "number of shades",
+            ),
+            "dynamic_range": _spec_value(
+                _check_dynamic_range, dr, defaults.dynamic_range, "dynamic range"
+            ),
+        }
+    )
+
+
+def _parse_specs(lines: Iterable[str], defaults: Namespace) -> Iterator[Namespace]:
+    """
+    Parse batch specs: label, color1, color2, number of shades, dynamic range.
+
+    Fields are separated by commas. Empty (or omitted trailing) fields get
+    the values of the command line arguments. Empty lines & comments are skipped.
+
+    >>> defaults = Namespace(
+    ...     label="color", color2=None, number_of_shades=19, dynamic_range=0
+    ... )
+    >>> lines = ["# label,color1,color2,shades,range", "tables,7ab1e5", ""]
+    >>> for spec in _parse_specs([*lines, "bad-guy, badddd, aa601f, , 66"], defaults):
+    ...     print(vars(spec))
+    {'label': 'tables', 'color2': None, 'number_of_shades': 19, 'dynamic_range': 0, 'color1': '7ab1e5'}
+    {'label': 'bad-guy', 'color2': 'aa601f', 'number_of_shades': 19, 'dynamic_range': 66, 'color1': 'badddd'}
+    >>> defaults.color2 = "000000"
+    >>> [spec.color2 for spec in _parse_specs(["a,7ab1e5", "b,7ab1e5,fff"], defaults)]
+    ['000000', 'fff']
+    >>> list(_parse_specs(["a,7ab1e5", "", "a"], defaults))
+    Traceback (most recent call last):
+    ...
+    argparse.ArgumentTypeError: line 3: expected 2 to 5 fields, got 1
+    >>> list(_parse_specs(["a,7ab1e5,,many"], defaults))
+    Traceback (most recent call last):
+    ...
+    argparse.ArgumentTypeError: line 1: invalid number of shades: 'many'
+    >>> list(_parse_specs(["a,7ab1e5", "b,orange"], defaults))
+    Traceback (most recent call last):
+    ...
+    argparse.ArgumentTypeError: line 2: invalid color: 'orange'
+    """  # noqa: E501
+    for n, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            yield _parse_spec(line, defaults)
+        except ArgumentTypeError as e:
+            msg = f"line {n}: {e}"
+            raise ArgumentTypeError(msg) from None
+
+
+def _single_runner(args: Namespace) -> _CommandRunner:
+    return (RunnerTwoColors if args.color2 else RunnerOneColor)(args)
+
+
+def _shades_lines(args: Namespace) -> list[str]:
+    return list(_single_runner(args).run())
+
+
+def _shades_swatches(args: Namespace) -> list[Swatch]:
+    return list(_single_runner(args).swatches())
+
+
+class RunnerBatch(ExportingRunner):
+    r"""
+    Shades for each spec in a batch, optionally generated by worker processes.
+
+    >>> from tempfile import TemporaryDirectory
+    >>> from kleur.cli import parser
+    >>> with TemporaryDirectory() as tmp:
+    ...     specs = Path(tmp) / "specs.csv"
+    ...     _ = specs.write_text("a,7ab1e5,,2\nb,f80,000,2\n")
+    ...     argv = ["shades", "-f", str(specs), "-j", "2", "--format", "csv"]
+    ...     args = parser(["shades"]).parse_args(argv)
+    ...     args.func(args)
+    group,name,hex,hue,saturation,lightness
+    a,033,2f516f,242.1,67.45,33.33
+    a,067,67a8e0,242.1,67.45,66.67
+    b,033,694736,32.85,48.55,33.33
+    b,067,f58418,32.85,97.1,66.67
+    """
+
+    def __init__(self, args: Namespace) -> None:
+        self._jobs: int = args.jobs
+        source = "stdin" if args.batch == "-" else args.batch
+        try:
+            if args.batch == "-":
+                self._specs = list(_parse_specs(sys.stdin, args))
+            else:
+                with Path(args.batch).open(encoding="utf-8") as f:
+                    self._specs = list(_parse_specs(f, args))
+        except OSError as e:
+            msg = f"can't read {source}: {e.strerror}"
+            raise ArgumentTypeError(msg) from None
+        except ArgumentTypeError as e:
+            msg = f"{source}, {e}"
+            raise ArgumentTypeError(msg) from None
+
+    def _results[T](self, func: Callable[[Namespace], T]) -> Iterator[T]:
+        if self._jobs == 1:
+            yield from map(func, self._specs)
+            return
+
+        # Workers can't detect the terminal themselves, so let them use ours.
+        # (The process pool module is only imported here, when actually needed.)
+        with futures.ProcessPoolExecutor(
+            self._jobs, initializer=set_color_depth, initargs=(color_depth(),)
+        ) as pool:
+            chunk_size = max(1, len(self._specs) // (self._jobs * 4))
+            # Results are yielded in order of the specs, as soon as they're available.
+            yield from pool.map(func, self._specs, chunksize=chunk_size)
+
+    def swatches(self) -> Iterator[Swatch]:
+        for swatches in self._results(_shades_swatches):
+            yield from swatches
+
+    def run(self) -> Iterator[str]:
+        for i, lines in enumerate(self._results(_shades_lines)):
+            if i:
+                yield ""
+            yield from lines
+
+
+class ShadesGenerator(OutputArgsParser):
     _name = "shades"
 
     def __init__(self, parser: ArgumentParser) -> None:
         super().__init__(parser)
+        self._error = parser.error
         parser.add_argument("-l", "--label", type=str, default="color")
-        parser.add_argument("-c", "--color1", type=str, required=True)
-        parser.add_argument("-k", "--color2", type=str)
+        input_args = parser.add_mutually_exclusive_group(required=True)
+        input_args.add_argument("-c", "--color1", type=check_hex)
+        input_args.add_argument(
+            "-f",
+            "--batch",
+            metavar="FILE",
+            help="file with one spec per line (- for stdin): "
+            "label,color1[,color2[,number of shades[,dynamic range]]]",
+        )
+        parser.add_argument("-k", "--color2", type=check_hex)
         parser.add_argument(
-            "-s", "--number-of-shades", type=check_integer_in_range(1, 99), default=19
+            "-s", "--number-of-shades", type=_check_number_of_shades, default=19
         )
         parser.add_argument(
             "-b", "--include-black-and-white", action="store_true", default=False
@@ -134,8 +333,35 @@ class ShadesGenerator(ArgsParser):
             "-i", "--include-input-shades", action="store_true", default=False
         )
         parser.add_argument(
-            "-d", "--dynamic-range", type=check_integer_in_range(0, 100), default=0
+            "-d", "--dynamic-range", type=_check_dynamic_range, default=0
+        )
+        parser.add_argument(
+            "-j", "--jobs", type=check_integer_in_range(1, None), default=1
         )
 
-    def _runner_cls(self, args: Namespace) -> type[CommandRunner]:
+    def _run_command(self, args: Namespace) -> None:
+        try:
+            super()._run_command(args)
+        except ArgumentTypeError as e:  # Invalid batch specs
+            self._error(str(e))
+
+    def _runner_cls(self, args: Namespace) -> type[ExportingRunner]:
+        if args.batch:
+            return RunnerBatch
         return RunnerTwoColors if args.color2 else RunnerOneColor
+
+    def _cache_params(self, args: Namespace) -> Mapping[str, object] | None:
+        if args.batch:
+            # Specs are read from a file (or stdin), so they're not known upfront.
+            return None
+        c2 = args.color2 and normalize_rgb_hex(args.color2)
+        return {
+            "label": args.label,
+            "color1": normalize_rgb_hex(args.color1),
+            "color2": c2,
+            "number_of_shades": args.number_of_shades,
+            "include_black_and_white": args.include_black_and_white,
+            "include_input_shades": args.include_input_shades,
+            # The dynamic range only affects shades based on two colors.
+            "dynamic_range": args.dynamic_range if c2 else None,
+        }
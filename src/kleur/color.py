@@ -1,15 +1,25 @@
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from enum import IntFlag, auto
-from functools import cached_property, total_ordering
-from typing import TYPE_CHECKING, NamedTuple
+from functools import total_ordering
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar, NamedTuple
+from weakref import WeakValueDictionary
 
-from based_utils.class_utils import Modifier, WithAttrModifiers
 from based_utils.interpol import mapped, mapped_cyclic, trim, trim_cyclic
-from hsluv import hex_to_hsluv, hsluv_to_hex, hsluv_to_rgb, rgb_to_hsluv
+
+from .caching import LRUCache
+from .contrast import contrast_ratio, shade_for_contrast
+from .hsluv_engine import rgb_to_hex
+from .rgb_table import rgb_table
+from .spaces import HSLUV, SPACES, color_space
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterator
 
+    from based_utils.class_utils import Modifier
+
+    from .spaces import ColorSpace
+
 _INCREASE_STEP = 0.2
 
 
@@ -58,34 +68,74 @@ def normalize_rgb_hex(rgb_hex: str) -> str:
 
 type RGB = tuple[int, int, int]
 
+type _Floats = tuple[float, float, float]
+
+# HSLuv values are quantized (rounded to this amount of digits) to form cache keys.
+_QUANTIZATION_DIGITS = 9
+
+# Process-wide cache of HSLuv -> RGB conversions (resizable & inspectable),
+# keyed by the name of the color space along with the quantized values.
+conversion_cache = LRUCache[tuple[str, float, float, float], _Floats](max_size=1 << 16)
+
+
+def _converted(key: tuple[str, float, float, float]) -> _Floats:
+    name, h, s, li = key
+    return SPACES[name].to_rgb((h, s, li))
+
+
+def _rgb_8bit(rgb: _Floats) -> RGB:
+    r, g, b = rgb
+    return round(r * 255), round(g * 255), round(b * 255)
+
+
+class _HSL(NamedTuple):
+    """Hue (0 - 360), saturation & lightness (0 - 100) in the current color space."""
 
-class _HSLuv(NamedTuple):
     hue: float
     saturation: float
     lightness: float
 
     @classmethod
-    def from_hex(cls, rgb_hex: str) -> _HSLuv:
-        return cls(*hex_to_hsluv(f"#{rgb_hex}"))
+    def from_hex(cls, rgb_hex: str) -> _HSL:
+        rgb = int(rgb_hex, 16)
+        # The table holds HSLuv values, so it is of no use in other color spaces.
+        if (space := color_space()) is HSLUV and (table := rgb_table()):
+            return cls(*table[rgb])
+        r, g, b = rgb >> 16, rgb >> 8 & 0xFF, rgb & 0xFF
+        return cls(*space.from_rgb((r / 255, g / 255, b / 255)))
+
+    def rgb_floats_in(self, space: ColorSpace) -> _Floats:
+        h, s, li = (round(v, _QUANTIZATION_DIGITS) for v in self)
+        return conversion_cache.get((space.name, h, s, li), _converted)
+
+    @property
+    def _as_rgb_floats(self) -> _Floats:
+        return self.rgb_floats_in(color_space())
 
     @property
     def as_hex(self) -> str:
-        return hsluv_to_hex(self)[1:]
+        return rgb_to_hex(self._as_rgb_floats)[1:]
 
     @classmethod
-    def from_rgb(cls, rgb: RGB) -> _HSLuv:
+    def from_rgb(cls, rgb: RGB) -> _HSL:
         r, g, b = rgb
-        return cls(*rgb_to_hsluv((r / 255, g / 255, b / 255)))
+        # The table only covers 8-bit channel values (no bits set outside 0-255).
+        space = color_space()
+        if space is HSLUV and (table := rgb_table()) and not (r | g | b) >> 8:
+            return cls(*table[r << 16 | g << 8 | b])
+        return cls(*space.from_rgb((r / 255, g / 255, b / 255)))
+
+    def rgb_in(self, space: ColorSpace) -> RGB:
+        return _rgb_8bit(self.rgb_floats_in(space))
 
     @property
     def as_rgb(self) -> RGB:
-        r, g, b = hsluv_to_rgb(self)
-        return round(r * 255), round(g * 255), round(b * 255)
+        return _rgb_8bit(self._as_rgb_floats)
 
 
 @total_ordering
-@dataclass(frozen=True)
-class Color(WithAttrModifiers):
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Color:
     class Props(IntFlag):
         H = auto()
         S = auto()
@@ -99,21 +149,102 @@ class Color(WithAttrModifiers):
     saturation: float = 1  # 0 - 1 (ratio)
     lightness: float = 0.5  # 0 - 1 (ratio)
 
+    # Conversion results, computed lazily (instead of using cached properties, which
+    # would need a __dict__ per instance). Derived colors are not cached at all:
+    # they are cheap to create, and their conversions are served by conversion_cache.
+    # Racing threads might both compute a result, but always the same (immutable) one.
+    # Results are kept along with their color space, which might be changed later on.
+    _rgb: tuple[ColorSpace, RGB] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _hex: tuple[ColorSpace, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # RGB values in HSLuv, whatever the current color space (so hashes never change).
+    _key: RGB | None = field(default=None, init=False, repr=False, compare=False)
+
+    _interned: ClassVar[WeakValueDictionary[tuple, Color]] = WeakValueDictionary()
+    _interned_lock: ClassVar[Lock] = Lock()
+
     @property
     def _attr_modifiers(self) -> dict[str, Modifier]:
         return {"hue": trim_cyclic, "saturation": trim, "lightness": trim}
 
+    def __post_init__(self) -> None:
+        # Frozen dataclass, so the trimmed values have to be set through object.
+        for name, convert in self._attr_modifiers.items():
+            object.__setattr__(self, name, convert(getattr(self, name)))
+
     def __repr__(self) -> str:
+        """
+        Hue, saturation & lightness, along with the color space they're expressed in.
+
+        >>> from kleur.spaces import set_color_space
+        >>> set_color_space("oklch")
+        >>> Color(0.5, 1, 0.25)
+        OKLCH(180.00°, 100.00%,  25.00%)
+        >>> set_color_space("hsluv")
+        """
         sh, ss, sl = self.prop_strings()
-        return f"HSLuv({sh}, {ss}, {sl})"
+        return f"{color_space().label}({sh}, {ss}, {sl})"
 
     def __eq__(self, other: object) -> bool:
+        """
+        Colors are considered equal when they have the same RGB values (in HSLuv).
+
+        Hashes are based on the RGB values as well, so equal colors can be
+        used interchangeably as dict keys / set members:
+        >>> {Color(0.4, 0, 0.5), Color(0.6, 0, 0.5), Color(0.6, 1, 0.5)}
+        {HSLuv(144.00°,   0.00%,  50.00%), HSLuv(216.00°, 100.00%,  50.00%)}
+
+        Both don't depend on the color space, which might change later on:
+        >>> from kleur.spaces import set_color_space
+        >>> color = Color(30 / 360, 1, 0.6)
+        >>> colors = {color}
+        >>> set_color_space("oklch")
+        >>> color in colors, Color(30 / 360, 1, 0.6) in colors
+        (True, True)
+        >>> set_color_space("hsluv")
+        """
         if isinstance(other, Color):
-            return self.as_rgb == other.as_rgb
-        raise NotImplementedError
+            return self._key_rgb == other._key_rgb
+        return NotImplemented
 
     def __hash__(self) -> int:
-        return hash(iter(self))
+        return hash(self._key_rgb)
+
+    @property
+    def _key_rgb(self) -> RGB:
+        if (key := self._key) is None:
+            key = self._as_hsl.rgb_in(HSLUV)
+            object.__setattr__(self, "_key", key)
+        return key
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # Only hue, saturation & lightness are pickled (not the cached conversions).
+        return type(self), (self.hue, self.saturation, self.lightness)
+
+    @classmethod
+    def interned(
+        cls, hue: float = 0, saturation: float = 1, lightness: float = 0.5
+    ) -> Color:
+        """
+        Shared instance for the given hue, saturation & lightness.
+
+        Repeatedly asking for the same color will return the same instance
+        (as long as it is still referenced somewhere), along with the
+        RGB / hex values it has computed already.
+
+        >>> Color.interned(0.5, 1, 0.5) is Color.interned(1.5, 1, 0.5)
+        True
+        >>> Color(0.5, 1, 0.5) is Color(1.5, 1, 0.5)
+        False
+        """
+        key = cls, trim_cyclic(hue), trim(saturation), trim(lightness)
+        with cls._interned_lock:
+            if (color := cls._interned.get(key)) is None:
+                color = cls._interned[key] = cls(hue, saturation, lightness)
+        return color
 
     def __lt__(self, other: Color) -> bool:
         return self.as_sortable_tuple < other.as_sortable_tuple
@@ -148,21 +279,21 @@ class Color(WithAttrModifiers):
         return Color(*[v for v, p in prop_values if p in props])
 
     def prop_strings(self) -> Iterator[str]:
-        for v, s in zip(self._as_hsluv, ("°", "%", "%"), strict=True):
+        for v, s in zip(self._as_hsl, ("°", "%", "%"), strict=True):
             yield f"{v:.2f}{s}".rjust(7)
 
-    @cached_property
+    @property
     def as_sortable_tuple(self) -> tuple[float, float, float]:
         """Will decide the sort order."""
         return self.lightness, self.saturation, self.hue
 
     @classmethod
-    def _from_hsluv(cls, hsluv: _HSLuv) -> Color:
-        return cls(hsluv.hue / 360, hsluv.saturation / 100, hsluv.lightness / 100)
+    def _from_hsl(cls, hsl: _HSL) -> Color:
+        return cls(hsl.hue / 360, hsl.saturation / 100, hsl.lightness / 100)
 
-    @cached_property
-    def _as_hsluv(self) -> _HSLuv:
-        return _HSLuv(self.hue * 360, self.saturation * 100, self.lightness * 100)
+    @property
+    def _as_hsl(self) -> _HSL:
+        return _HSL(self.hue * 360, self.saturation * 100, self.lightness * 100)
 
     @classmethod
     def from_hex(cls, rgb_hex: str) -> Color:
@@ -179,11 +310,16 @@ class Color(WithAttrModifiers):
         >>> k.as_hex, k.as_rgb
         ('00aaff', (0, 170, 255))
         """
-        return cls._from_hsluv(_HSLuv.from_hex(normalize_rgb_hex(rgb_hex)))
+        return cls._from_hsl(_HSL.from_hex(normalize_rgb_hex(rgb_hex)))
 
-    @cached_property
+    @property
     def as_hex(self) -> str:
-        return self._as_hsluv.as_hex
+        space = color_space()
+        if (cached := self._hex) is not None and cached[0] is space:
+            return cached[1]
+        rgb_hex = self._as_hsl.as_hex
+        object.__setattr__(self, "_hex", (space, rgb_hex))
+        return rgb_hex
 
     @classmethod
     def from_rgb(cls, rgb: RGB) -> Color:
@@ -200,11 +336,16 @@ class Color(WithAttrModifiers):
         >>> k.as_hex, k.as_rgb
         ('00aaff', (0, 170, 255))
         """
-        return cls._from_hsluv(_HSLuv.from_rgb(rgb))
+        return cls._from_hsl(_HSL.from_rgb(rgb))
 
-    @cached_property
+    @property
     def as_rgb(self) -> RGB:
-        return self._as_hsluv.as_rgb
+        space = color_space()
+        if (cached := self._rgb) is not None and cached[0] is space:
+            return cached[1]
+        rgb = self._as_hsl.as_rgb
+        object.__setattr__(self, "_rgb", (space, rgb))
+        return rgb
 
     def with_hue(self, hue: float) -> Color:
         return replace(self, hue=hue)
@@ -219,53 +360,53 @@ class Color(WithAttrModifiers):
         for step in range(1, n_intervals):
             yield self.shade(step / n_intervals)
 
-    @cached_property
+    @property
     def very_dark(self) -> Color:
         return self.shade(1 / 8)
 
-    @cached_property
+    @property
     def dark(self) -> Color:
         return self.shade(2 / 8)
 
-    @cached_property
+    @property
     def slightly_dark(self) -> Color:
         return self.shade(3 / 8)
 
-    @cached_property
+    @property
     def slightly_bright(self) -> Color:
         return self.shade(5 / 8)
 
-    @cached_property
+    @property
     def bright(self) -> Color:
         return self.shade(6 / 8)
 
-    @cached_property
+    @property
     def very_bright(self) -> Color:
         return self.shade(7 / 8)
 
     def brighter(self, relative_amount: float = _INCREASE_STEP) -> Color:
         return self + Color(hue=0, saturation=0, lightness=relative_amount)
 
-    @cached_property
+    @property
     def slightly_brighter(self) -> Color:
         return self.brighter(_INCREASE_STEP * 0.5)
 
-    @cached_property
+    @property
     def much_brighter(self) -> Color:
         return self.brighter(_INCREASE_STEP * 1.5)
 
     def darker(self, relative_amount: float = _INCREASE_STEP) -> Color:
         return self - Color(hue=0, saturation=0, lightness=relative_amount)
 
-    @cached_property
+    @property
     def slightly_darker(self) -> Color:
         return self.darker(_INCREASE_STEP * 0.5)
 
-    @cached_property
+    @property
     def much_darker(self) -> Color:
         return self.darker(_INCREASE_STEP * 1.5)
 
-    @cached_property
+    @property
     def has_ambiguous_hue(self) -> bool:
         """
         Determine if this color has a visually ambiguous hue.
@@ -357,7 +498,7 @@ class Color(WithAttrModifiers):
         hs, ss, ls = zip(c, k, strict=True)
         return Color(mapped_cyclic(amount, hs), mapped(amount, ss), mapped(amount, ls))
 
-    @cached_property
+    @property
     def contrasting_shade(self) -> Color:
         """
         Color with a lightness that contrasts with the current color.
@@ -380,7 +521,7 @@ class Color(WithAttrModifiers):
         """
         return self.shade((self.lightness + 0.5) % 1)
 
-    @cached_property
+    @property
     def contrasting_shade_pair(self) -> tuple[Color, Color]:
         """
         Return this color together with its contrasting shade.
@@ -391,7 +532,39 @@ class Color(WithAttrModifiers):
         """
         return self, self.contrasting_shade
 
-    @cached_property
+    def contrast_ratio(self, other: Color) -> float:
+        """
+        Contrast ratio (as defined by WCAG 2) with another color: from 1 to 21.
+
+        >>> round(Color.from_hex("fff").contrast_ratio(Color.from_hex("767676")), 2)
+        4.54
+        """
+        return contrast_ratio(self.as_rgb, other.as_rgb)
+
+    def shade_for_contrast(
+        self, against: Color, min_ratio: float = 4.5
+    ) -> Color | None:
+        """
+        Shade of this color nearest to it, with at least the given contrast ratio.
+
+        Unlike contrasting_shade, this guarantees an actual (WCAG 2) contrast ratio,
+        while changing the lightness as little as possible:
+        >>> orange, white = Color.from_hex("f80"), Color.from_hex("fff")
+        >>> round(orange.contrast_ratio(white), 2)
+        2.39
+        >>> k = orange.shade_for_contrast(white)
+        >>> k.as_hex, round(k.contrast_ratio(white), 2)
+        ('b65f00', 4.54)
+        >>> orange.shade_for_contrast(white, 22) is None
+        True
+
+        :param against: color to contrast with (e.g. a background color)
+        :param min_ratio: 4.5 for normal text, 3 for large text (AA) or 7 (AAA)
+        :return: the nearest shade meeting the ratio (None if there is none at all)
+        """
+        return shade_for_contrast(self, against, min_ratio)
+
+    @property
     def contrasting_hue(self) -> Color:
         """
         Color with a hue that contrasts with the current color.
@@ -413,7 +586,7 @@ class Color(WithAttrModifiers):
         """
         return self.with_hue(self.hue + 0.5)
 
-    @cached_property
+    @property
     def contrasting_hue_pair(self) -> tuple[Color, Color]:
         """Return this color together with its contrasting hue."""
         return self, self.contrasting_hue
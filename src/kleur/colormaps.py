@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING
+
+from based_utils.class_utils import get_class_vars
+
+from .color import Color
+from .gradients import Gradient
+from .palettes import BLACK
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .color import RGB
+
+
+class Colormap:
+    """
+    Color ramp, baked into a fixed-size lookup table of RGB bytes.
+
+    Values are mapped to colors by an index lookup, without any color math:
+    >>> cm = Colormap.between(Color.from_hex("000"), Color.from_hex("fff"), 5)
+    >>> cm.as_hex
+    ['000000', '3b3b3b', '777777', 'b9b9b9', 'ffffff']
+    >>> cm.map_rgb([0.2, -1, float("nan")])
+    [(59, 59, 59), (0, 0, 0), (0, 0, 0)]
+    >>> red = Color.from_hex("f00")
+    >>> Colormap(cm.gradient, 5, clamp=False, nan_color=red).map([2, 1]).hex()
+    'ff0000ffffff'
+    >>> Colormap(cm.gradient, domain=(3, 3))
+    Traceback (most recent call last):
+    ...
+    ValueError: domain without any range: (3, 3)
+    """
+
+    def __init__(
+        self,
+        gradient: Gradient,
+        size: int = 256,
+        *,
+        domain: tuple[float, float] = (0, 1),
+        clamp: bool = True,
+        nan_color: Color = BLACK,
+    ) -> None:
+        """
+        Create a colormap.
+
+        :param gradient: color ramp, sampled between positions 0 and 1
+        :param size: number of entries in the lookup table
+        :param domain: range of input values that will be mapped onto the ramp
+        :param clamp: map values outside the domain to the outer colors of the ramp
+                      (instead of to the NaN color)
+        :param nan_color: color for NaN (and unclamped out of range) values
+        """
+        if size < 2:  # noqa: PLR2004
+            raise ValueError(size)
+        self.gradient, self._size, self._clamp = gradient, size, clamp
+        self._low, high = domain
+        if high == self._low:
+            msg = f"domain without any range: {domain}"
+            raise ValueError(msg)
+        self._scale = (size - 1) / (high - self._low)
+        colors = gradient.sample(i / (size - 1) for i in range(size))
+        self._entries = [bytes(rgb) for rgb in colors.as_rgb]
+        self._nan_entry = bytes(nan_color.as_rgb)
+
+    @classmethod
+    def between(cls, start: Color, end: Color, size: int = 256) -> Colormap:
+        """Colormap of a blend between two colors."""
+        return cls(Gradient.between(start, end), size)
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[Color], size: int = 256) -> Colormap:
+        """Colormap through a sequence of colors (e.g. shades), evenly spaced."""
+        return cls(Gradient.evenly_spaced(*colors), size)
+
+    @classmethod
+    def from_palette(cls, palette_cls: type, size: int = 256) -> Colormap:
+        """Colormap through the colors of a palette class, ordered by hue."""
+        colors = get_class_vars(palette_cls, value_type=Color).values()
+        return cls.from_colors(sorted(colors, key=lambda c: c.hue), size)
+
+    def indices(self, values: Iterable[float]) -> Iterator[int | None]:
+        """Lookup table indices for the values (None for NaN / out of range)."""
+        low, scale, last, clamp = self._low, self._scale, self._size - 1, self._clamp
+        for v in values:
+            f = (v - low) * scale
+            if 0 <= f <= last:
+                yield int(f + 0.5)
+            elif clamp and f == f:  # noqa: PLR0124 (only NaN is not equal to itself)
+                yield 0 if f < 0 else last
+            else:
+                yield None
+
+    def map(self, values: Iterable[float]) -> bytes:
+        """Map values to packed RGB bytes (3 bytes per value)."""
+        entries, nan = self._entries, self._nan_entry
+        return b"".join(nan if i is None else entries[i] for i in self.indices(values))
+
+    def map_rgb(self, values: Iterable[float]) -> list[RGB]:
+        data = self.map(values)
+        return list(zip(data[::3], data[1::3], data[2::3], strict=True))
+
+    @property
+    def as_bytes(self) -> bytes:
+        return b"".join(self._entries)
+
+    @property
+    def as_hex(self) -> list[str]:
+        return [e.hex() for e in self._entries]
+
+    def as_css(self, label: str = "color") -> Iterator[str]:
+        """Lookup table as CSS variables."""
+        width = len(str(self._size - 1))
+        for i, rgb_hex in enumerate(self.as_hex):
+            yield f"--{label}-{i:0{width}}: #{rgb_hex};"
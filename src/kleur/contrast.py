@@ -0,0 +1,140 @@
+"""
+Contrast ratios (as defined by WCAG 2) & shades that meet a minimum ratio.
+
+Luminance only increases with HSLuv lightness, so for a given hue & saturation
+the lightness needed for a certain contrast can be found by a binary search over
+a table of luminances, instead of repeated conversions. Tables are built once per
+hue & saturation (from the actual 8-bit RGB values, as seen by the terminal /
+browser) and reused afterwards.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+from .caching import LRUCache
+from .spaces import color_space
+
+if TYPE_CHECKING:
+    from .color import RGB, Color
+
+# Number of lightness intervals per luminance table.
+_TABLE_STEPS = 256
+
+
+def _linear(v: int) -> float:
+    c = v / 255
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4  # noqa: PLR2004
+
+
+_LINEAR = [_linear(v) for v in range(256)]
+
+
+def relative_luminance(rgb: RGB) -> float:
+    """
+    Relative luminance of an (sRGB) color: 0 for black, 1 for white.
+
+    >>> [round(relative_luminance(rgb), 4) for rgb in [(0, 0, 0), (255, 0, 0)]]
+    [0.0, 0.2126]
+    """
+    r, g, b = rgb
+    return 0.2126 * _LINEAR[r] + 0.7152 * _LINEAR[g] + 0.0722 * _LINEAR[b]
+
+
+def contrast_ratio(rgb: RGB, other: RGB) -> float:
+    """
+    Contrast ratio between two colors: from 1 (no contrast) to 21 (black & white).
+
+    >>> round(contrast_ratio((255, 255, 255), (118, 118, 118)), 2)
+    4.54
+    """
+    lighter, darker = sorted([relative_luminance(rgb), relative_luminance(other)])[::-1]
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+class LuminanceTable:
+    """
+    Luminances of all shades of a color (hue & saturation), by lightness.
+
+    A query bisects the table and interpolates between the two entries around
+    the target, checking the result with a single conversion.
+    """
+
+    def __init__(self, color: Color) -> None:
+        self._color = color
+        self.lightnesses = [i / _TABLE_STEPS for i in range(_TABLE_STEPS + 1)]
+        luminances = [
+            relative_luminance(color.shade(li).as_rgb) for li in self.lightnesses
+        ]
+        # Rounding to 8-bit RGB values could make the luminance drop by a hair
+        # between adjacent shades. Keep monotone versions of the table, so it can be
+        # bisected: where the running maximum first reaches a value (or the running
+        # minimum from the end last stays below it), it equals the actual luminance.
+        self._maxima = list(accumulate(luminances, max))
+        self._minima = list(accumulate(reversed(luminances), min))[::-1]
+
+    def _luminance(self, lightness: float) -> float:
+        return relative_luminance(self._color.shade(lightness).as_rgb)
+
+    def _interpolated(self, luminances: list[float], i: int, target: float) -> float:
+        """Lightness between entries i - 1 & i at which target is reached."""
+        (l0, l1), (y0, y1) = self.lightnesses[i - 1 : i + 1], luminances[i - 1 : i + 1]
+        return l0 + (target - y0) / (y1 - y0) * (l1 - l0)
+
+    def lightness_at_least(self, luminance: float) -> float | None:
+        """Lowest lightness with at least the given luminance (if any)."""
+        i = bisect_left(self._maxima, luminance)
+        if i > _TABLE_STEPS:
+            return None
+        if not i:
+            return self.lightnesses[0]
+        lightness = self._interpolated(self._maxima, i, luminance)
+        # Otherwise, the table entry itself is known to meet the target.
+        return (
+            lightness if self._luminance(lightness) >= luminance else i / _TABLE_STEPS
+        )
+
+    def lightness_at_most(self, luminance: float) -> float | None:
+        """Highest lightness with at most the given luminance (if any)."""
+        i = bisect_right(self._minima, luminance) - 1
+        if i < 0:
+            return None
+        if i == _TABLE_STEPS:
+            return self.lightnesses[i]
+        lightness = self._interpolated(self._minima, i + 1, luminance)
+        return (
+            lightness if self._luminance(lightness) <= luminance else i / _TABLE_STEPS
+        )
+
+
+# Tables by color space, hue & saturation. Shades of a color (e.g. a ramp) share
+# the same table.
+luminance_tables = LRUCache[tuple[str, float, float], LuminanceTable](max_size=256)
+
+
+def luminance_table(color: Color) -> LuminanceTable:
+    return luminance_tables.get(
+        (color_space().name, color.hue, color.saturation),
+        lambda _: LuminanceTable(color),
+    )
+
+
+def shade_for_contrast(color: Color, against: Color, min_ratio: float) -> Color | None:
+    """
+    Shade of a color nearest to it, with at least the given contrast ratio.
+
+    :return: the nearest shade that meets the ratio (or None if no shade does)
+    """
+    y = relative_luminance(against.as_rgb)
+    if contrast_ratio(color.as_rgb, against.as_rgb) >= min_ratio:
+        return color
+
+    table = luminance_table(color)
+    candidates = [
+        table.lightness_at_least(min_ratio * (y + 0.05) - 0.05),
+        table.lightness_at_most((y + 0.05) / min_ratio - 0.05),
+    ]
+    lightnesses = [li for li in candidates if li is not None]
+    if not lightnesses:
+        return None
+    return color.shade(min(lightnesses, key=lambda li: abs(li - color.lightness)))
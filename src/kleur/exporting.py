@@ -0,0 +1,108 @@
+"""
+Plain (machine-readable) representations of named colors.
+
+Colors are grouped swatches, e.g. all shades of one color share a group:
+>>> from kleur import BLACK
+>>> swatches = [("sky", "050", Color.from_hex("0096ff")), ("ink", "010", BLACK)]
+>>> print(export(swatches, "css"))
+:root {
+  --sky-050: #0096ff;
+  --ink-010: #000000;
+}
+>>> print(export(swatches, "csv"))
+group,name,hex,hue,saturation,lightness
+sky,050,0096ff,249.95,100.0,60.81
+ink,010,000000,0.0,0.0,0.0
+>>> print(export(swatches[:1], "tokens"))
+{
+  "sky": {
+    "050": {
+      "$type": "color",
+      "$value": "#0096ff"
+    }
+  }
+}
+"""
+
+import csv
+import io
+import json
+from typing import TYPE_CHECKING
+
+from .color import Color
+from .palettes import GREY
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+type Swatch = tuple[str, str, Color]
+
+
+def palette_swatches(
+    colors: Mapping[str, Color], shades: Sequence[float], vibrances: Sequence[float]
+) -> Iterator[Swatch]:
+    """
+    Grey & the colors of a palette in all shades & vibrances (as in kleur palette).
+
+    Colors are grouped by name & vibrance, shades are named by their lightness:
+    >>> blue = {"blue": Color(248 / 360)}
+    >>> [f"{g}-{n}" for g, n, _ in palette_swatches(blue, [0.25, 0.75], [0.5, 1])]
+    ['grey-025', 'grey-075', 'blue-v050-025', 'blue-v050-075', 'blue-v100-025', 'blue-v100-075']
+    """  # noqa: E501
+    shade_names = [f"{s * 100:03.0f}" for s in shades]
+    for shade_name, shade in zip(shade_names, shades, strict=True):
+        yield "grey", shade_name, GREY.shade(shade)
+    for v in vibrances:
+        for name, color in colors.items():
+            k = color.saturated(v)
+            for shade_name, shade in zip(shade_names, shades, strict=True):
+                yield f"{name}-v{v * 100:03.0f}", shade_name, k.shade(shade)
+
+
+def _css(swatches: Iterable[Swatch]) -> str:
+    variables = "".join(f"  --{g}-{n}: #{c.as_hex};\n" for g, n, c in swatches)
+    return f":root {{\n{variables}}}"
+
+
+def _scss(swatches: Iterable[Swatch]) -> str:
+    return "\n".join(f"${g}-{n}: #{c.as_hex};" for g, n, c in swatches)
+
+
+def _json(swatches: Iterable[Swatch]) -> str:
+    return json.dumps({f"{g}-{n}": f"#{c.as_hex}" for g, n, c in swatches}, indent=2)
+
+
+def _csv_row(swatch: Swatch) -> list[str | float]:
+    g, n, c = swatch
+    hsl = c.hue * 360, c.saturation * 100, c.lightness * 100
+    return [g, n, c.as_hex, *(round(float(v), 2) for v in hsl)]
+
+
+def _csv(swatches: Iterable[Swatch]) -> str:
+    f = io.StringIO()
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(["group", "name", "hex", "hue", "saturation", "lightness"])
+    writer.writerows(map(_csv_row, swatches))
+    return f.getvalue().rstrip("\n")
+
+
+def _tokens(swatches: Iterable[Swatch]) -> str:
+    """Design tokens (https://www.designtokens.org/tr/drafts/format/)."""
+    groups: dict[str, dict[str, dict[str, str]]] = {}
+    for g, n, c in swatches:
+        groups.setdefault(g, {})[n] = {"$type": "color", "$value": f"#{c.as_hex}"}
+    return json.dumps(groups, indent=2)
+
+
+FORMATS: dict[str, Callable[[Iterable[Swatch]], str]] = {
+    "css": _css,
+    "scss": _scss,
+    "json": _json,
+    "csv": _csv,
+    "tokens": _tokens,
+}
+
+
+def export(swatches: Iterable[Swatch], fmt: str) -> str:
+    """Swatches as one block of text in the given format (one of FORMATS)."""
+    return FORMATS[fmt](swatches)
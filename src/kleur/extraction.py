@@ -0,0 +1,151 @@
+"""
+Dominant colors of images, found by (mini-batch) k-means clustering in HSLuv space.
+
+Pixels are processed one chunk at a time, so memory use doesn't depend on the
+size of the image. Every chunk is reduced to its distinct (slightly quantized)
+colors with their pixel counts first, so the clustering work per chunk depends
+on the number of different colors in it rather than on the number of pixels.
+
+Only that reduction is vectorized (C-level slicing & counting): seeding,
+assignment and center updates are plain Python loops over the distinct colors
+of a chunk (at most 32768) times the k centers, so noisy or large chunks of
+photos take up to a few hundred milliseconds each.
+"""
+
+from collections import Counter
+from math import atan2, cos, hypot, sin, tau
+from random import Random
+from typing import TYPE_CHECKING, NamedTuple
+
+from .arrays import ColorArray
+from .color import Color
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .color import RGB
+
+type _Point = tuple[float, float, float]
+
+# Channel values are rounded to 32 levels (including 0 & 255), limiting the number
+# of distinct colors (and thereby the size of the conversion cache) to 32768.
+_QUANTIZED = bytes(round(round(v * 31 / 255) * 255 / 31) for v in range(256))
+
+
+def _point(hue: float, saturation: float, lightness: float) -> _Point:
+    # Hue is an angle, so points are clustered in the cartesian space of the cylinder.
+    a = hue * tau
+    return saturation * cos(a), saturation * sin(a), lightness
+
+
+def _dist2(p: _Point, q: _Point) -> float:
+    (x1, y1, z1), (x2, y2, z2) = p, q
+    return (x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2
+
+
+class DominantColor(NamedTuple):
+    color: Color
+    share: float  # fraction of the pixels that is nearest to this color
+
+
+class PaletteExtractor:
+    """
+    Dominant colors of a stream of pixel chunks (packed RGB bytes).
+
+    >>> extractor = PaletteExtractor(2)
+    >>> extractor.update(bytes.fromhex("ff0000" * 3 + "0000ff"))
+    >>> extractor.update(bytes.fromhex("0000ff" * 2 + "fe0101" * 2))
+    >>> [(d.color.as_hex, d.share) for d in extractor.dominant_colors]
+    [('ff0000', 0.625), ('0000ff', 0.375)]
+    """
+
+    def __init__(self, k: int = 8, *, seed: int = 0) -> None:
+        self._k = k
+        self._random = Random(seed)  # noqa: S311 (not used for anything secret)
+        self._centers: list[_Point] = []
+        self._weights: list[int] = []
+        self._points: dict[RGB, _Point] = {}
+
+    def _to_points(self, rgbs: list[RGB]) -> list[_Point]:
+        if new := [rgb for rgb in rgbs if rgb not in self._points]:
+            colors = ColorArray.from_rgb(new)
+            points = (_point(*t) for t in colors.as_tuples)
+            self._points.update(zip(new, points, strict=True))
+        return [self._points[rgb] for rgb in rgbs]
+
+    def _add_centers(self, points: list[_Point], weights: list[int]) -> None:
+        """Pick (more) centers from the points: k-means++, weighted by pixel counts."""
+        choose, indices, centers = (
+            self._random.choices,
+            range(len(points)),
+            self._centers,
+        )
+        if not centers:
+            centers.append(points[choose(indices, weights)[0]])
+            self._weights.append(0)
+        d2 = [min(_dist2(p, c) for c in centers) for p in points]
+        # Until there are k centers, or all points coincide with one already.
+        while len(centers) < self._k and any(d2):
+            c = points[
+                choose(indices, [w * d for w, d in zip(weights, d2, strict=True)])[0]
+            ]
+            centers.append(c)
+            self._weights.append(0)
+            d2 = [min(d, _dist2(p, c)) for d, p in zip(d2, points, strict=True)]
+
+    def _nearest(self, p: _Point) -> int:
+        centers = self._centers
+        return min(range(len(centers)), key=lambda i: _dist2(p, centers[i]))
+
+    def update(self, rgb_data: bytes) -> None:
+        """Process one chunk of pixels (packed RGB bytes) as a mini-batch."""
+        q = rgb_data.translate(_QUANTIZED)
+        counts = Counter(zip(q[0::3], q[1::3], q[2::3], strict=True))
+        if not counts:
+            return
+        points, weights = self._to_points(list(counts)), list(counts.values())
+        if len(self._centers) < self._k:
+            self._add_centers(points, weights)
+
+        # Assign the whole batch first, then move each center towards its points,
+        # with a learning rate that decreases with the number of pixels it has seen.
+        assigned = [self._nearest(p) for p in points]
+        for i, p, w in zip(assigned, points, weights, strict=True):
+            self._weights[i] = total = self._weights[i] + w
+            (cx, cy, cz), (px, py, pz), f = self._centers[i], p, w / total
+            self._centers[i] = (
+                cx + (px - cx) * f,
+                cy + (py - cy) * f,
+                cz + (pz - cz) * f,
+            )
+
+    @property
+    def dominant_colors(self) -> list[DominantColor]:
+        """Cluster centers as colors, in order of dominance."""
+        total = sum(self._weights)
+        clusters = sorted(zip(self._weights, self._centers, strict=True), reverse=True)
+        return [
+            DominantColor(Color(atan2(y, x) / tau, hypot(x, y), z), w / total)
+            for w, (x, y, z) in clusters
+            if w
+        ]
+
+
+def extract_palette(
+    chunks: Iterable[bytes], k: int = 8, *, seed: int = 0
+) -> list[DominantColor]:
+    r"""
+    Dominant colors of an image, given as chunks of packed RGB bytes.
+
+    >>> from io import BytesIO
+    >>> from kleur.images import read_rgb_chunks
+    >>> ppm = b"P6\n4 2\n255\n" + bytes.fromhex("ff8000" * 5 + "7ab1e5" * 3)
+    >>> for color, share in extract_palette(read_rgb_chunks(BytesIO(ppm), 3), 3):
+    ...     print(color.as_hex, share)
+    ff8400 0.625
+    7bb5e6 0.375
+    """
+    extractor = PaletteExtractor(k, seed=seed)
+    for chunk in chunks:
+        extractor.update(chunk)
+    return extractor.dominant_colors
@@ -1,35 +1,96 @@
 import os
 import sys
+from enum import IntEnum
 from functools import cache
-from typing import TYPE_CHECKING, Literal, Self, overload
+from typing import TYPE_CHECKING, Literal, NamedTuple, Self, overload
 
-from based_utils.cli import apply_ansi_style
-from based_utils.data import ignore
+from based_utils.cli import ansi_style, apply_ansi_style
+from based_utils.data import ignore, invert_dict
 
 from .color import Color
-from .palettes import Colors
+from .indexed_colors import ansi_16_index, xterm_256_index
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator, Mapping
 
     from based_utils.cli.io import StringStyler
 
     from .color import RGB
 
 
+def _has_colors(env: Mapping[str, str], *, tty: bool) -> bool:
+    no = "NO_COLOR" in env
+    yes = "CLICOLOR_FORCE" in env
+    return not no and (yes or tty)
+
+
+class ColorDepth(IntEnum):
+    NONE = 0
+    ANSI_16 = 4
+    XTERM_256 = 8
+    TRUE_COLOR = 24
+
+
+_COLOR_DEPTH_NAMES = {
+    ColorDepth.NONE: "none",
+    ColorDepth.ANSI_16: "16",
+    ColorDepth.XTERM_256: "256",
+    ColorDepth.TRUE_COLOR: "truecolor",
+}
+_COLOR_DEPTHS = invert_dict(_COLOR_DEPTH_NAMES) | {"24bit": ColorDepth.TRUE_COLOR}
+
+_TERMS_16 = ("ansi", "cygwin", "linux", "rxvt", "screen", "tmux", "vt", "xterm")
+
+
+def detect_color_depth(env: Mapping[str, str], *, tty: bool) -> ColorDepth:
+    """
+    Color depth supported by a terminal, given its environment variables.
+
+    Can be forced by setting KLEUR_COLOR_DEPTH to none, 16, 256 or truecolor
+    (unless NO_COLOR is set). Otherwise it is derived from COLORTERM & TERM,
+    where an unknown terminal is assumed to support true color.
+
+    >>> detect_color_depth({"TERM": "xterm-256color"}, tty=True).name
+    'XTERM_256'
+    >>> detect_color_depth({"TERM": "xterm-256color"}, tty=False).name
+    'NONE'
+    """
+    override = env.get("KLEUR_COLOR_DEPTH", "").lower()
+    if override in _COLOR_DEPTHS and "NO_COLOR" not in env:
+        return _COLOR_DEPTHS[override]
+    if not _has_colors(env, tty=tty):
+        return ColorDepth.NONE
+    if env.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return ColorDepth.TRUE_COLOR
+    term = env.get("TERM", "").lower()
+    if "256" in term:
+        return ColorDepth.XTERM_256
+    if term.startswith(_TERMS_16):
+        return ColorDepth.ANSI_16
+    return ColorDepth.TRUE_COLOR
+
+
 @cache
-def _has_colors() -> bool:
-    no = "NO_COLOR" in os.environ
-    yes = "CLICOLOR_FORCE" in os.environ
-    maybe = sys.stdout.isatty()
-    return not no and (yes or maybe)
+def color_depth() -> ColorDepth:
+    """Color depth supported by the terminal (see detect_color_depth)."""
+    return detect_color_depth(os.environ, tty=sys.stdout.isatty())
+
+
+def set_color_depth(depth: ColorDepth) -> None:
+    """
+    Force the color depth for this process (and the ones started from it).
+
+    Useful for worker processes, rendering output for a terminal they can't detect.
+    """
+    os.environ["KLEUR_COLOR_DEPTH"] = _COLOR_DEPTH_NAMES[depth]
+    color_depth.cache_clear()
 
 
 type _StringStyler = Callable[[str], str]
 
 
 def _wrap_ansi_style(*values: int) -> StringStyler:
-    return apply_ansi_style(*values) if _has_colors() else ignore
+    return apply_ansi_style(*values) if color_depth() else ignore
 
 
 bold = _wrap_ansi_style(1)
@@ -76,13 +137,31 @@ def color_8bit(fg: int = None, bg: int = None) -> _StringStyler:
     return _wrap_ansi_style(*values)
 
 
-def color_rgb(fg: RGB = None, bg: RGB = None) -> _StringStyler:
-    values = []
+def _sgr_values(rgb: RGB, *, background: bool = False) -> tuple[int, ...]:
+    """Shortest SGR values for a color, given the color depth of the terminal."""
+    match color_depth():
+        case ColorDepth.XTERM_256:
+            return 48 if background else 38, 5, xterm_256_index(rgb)
+        case ColorDepth.ANSI_16:
+            # Normal colors: 30-37 (fg) / 40-47 (bg), bright: 90-97 (fg) / 100-107 (bg)
+            bright, i = divmod(ansi_16_index(rgb), 8)
+            offset = 90 if bright else 30
+            return ((offset + 10 if background else offset) + i,)
+        case _:
+            return 48 if background else 38, 2, *rgb
+
+
+def _rgb_values(fg: RGB | None, bg: RGB | None) -> list[int]:
+    values: list[int] = []
     if fg:
-        values += [38, 2, *fg]
+        values += _sgr_values(fg)
     if bg:
-        values += [48, 2, *bg]
-    return _wrap_ansi_style(*values)
+        values += _sgr_values(bg, background=True)
+    return values
+
+
+def color_rgb(fg: RGB = None, bg: RGB = None) -> _StringStyler:
+    return _wrap_ansi_style(*_rgb_values(fg, bg))
 
 
 class ColorStr[T](str):
@@ -115,8 +194,30 @@ class Colored:
         return ColorStr(v, self._fg, self._bg)
 
 
-OK = Colored(Colors.green)("✔")
-FAIL = Colored(Colors.red)("✘")
+def __getattr__(name: str) -> ColorStr:
+    """Status markers (OK / FAIL), built on first use instead of at import time."""
+    from .palettes import Colors  # noqa: PLC0415
+
+    markers = {"OK": (Colors.green, "✔"), "FAIL": (Colors.red, "✘")}
+    if name not in markers:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    color, symbol = markers[name]
+    marker = globals()[name] = Colored(color)(symbol)
+    return marker
+
+
+type Cell = tuple[object, Color | None, Color | None]
+"""Value to be rendered, along with its (optional) foreground & background color."""
+
+
+def _plain(v: object) -> Cell:
+    return v, None, None
+
+
+def _joined(cells: Iterable[Cell]) -> str:
+    """Cells styled one by one, the way ColorStr does it."""
+    return "".join(ColorStr(v, fg, bg) if fg or bg else str(v) for v, fg, bg in cells)
 
 
 class Highlighter:
@@ -138,8 +239,13 @@ class Highlighter:
     ) -> ColorStr | str:
         if not enabled:
             return str(v)
+        return ColorStr(*self.cell(v, inverted=inverted))
+
+    def cell(self, v: object, *, inverted: bool = False, enabled: bool = True) -> Cell:
+        if not enabled:
+            return _plain(v)
         c, k = self._color.contrasting_shade_pair
-        return Colored(*((c, k) if inverted else (k, c)))(v)
+        return (v, c, k) if inverted else (v, k, c)
 
 
 CP = Color.Props
@@ -152,17 +258,95 @@ class ColorHighlighter:
     def __call__(
         self, highlighted: CP = CP.ALL, *, enable_bounds_highlights: bool = False
     ) -> str:
+        return _joined(
+            self.cells(highlighted, enable_bounds_highlights=enable_bounds_highlights)
+        )
+
+    def cells(
+        self, highlighted: CP = CP.ALL, *, enable_bounds_highlights: bool = False
+    ) -> list[Cell]:
         c = self._color
         # Colors progressively built up with hue, saturation & lightness
         decomposed = [c.with_props(CP.H), c.with_props(CP.NO_L), c]
         # Go over each color property and highlight it if necessary.
-        values = " ".join(
-            Highlighter(k)(f" {s} ", enabled=p in highlighted)
+        values = [
+            Highlighter(k).cell(f" {s} ", enabled=p in highlighted)
             for (s, k, p) in zip(c.prop_strings(), decomposed, CP, strict=True)
-        )
-        n, start, end = b = "HSLuv", "[", "]"
+        ]
+        n, start, end = b = [_plain(s) for s in ("HSLuv", "[", "]")]
         if enable_bounds_highlights:
             # When some of the values were highlighted, highlight the outer brackets
             # as well to make it visually stand out more.
-            n, start, end = [Highlighter(c)(s, enabled=bool(highlighted)) for s in b]
-        return f"{n} {start} {values} {end}"
+            n, start, end = [
+                Highlighter(c).cell(s, enabled=bool(highlighted)) for s, _, _ in b
+            ]
+        space = _plain(" ")
+        v1, v2, v3 = values
+        return [n, space, start, space, v1, space, v2, space, v3, space, end]
+
+
+class RenderStats(NamedTuple):
+    escape_bytes: int
+    naive_escape_bytes: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.naive_escape_bytes - self.escape_bytes
+
+
+_RESET = ansi_style(0)
+
+
+class DiffRenderer:
+    """
+    Render rows of cells, while keeping track of the terminal state.
+
+    Only changes in foreground / background colors between subsequent cells will
+    be emitted as SGR sequences, instead of a full set / reset pair for each cell
+    (as ColorStr does).
+    """
+
+    def __init__(self) -> None:
+        self._escape_bytes = self._naive_escape_bytes = 0
+
+    @property
+    def stats(self) -> RenderStats:
+        return RenderStats(self._escape_bytes, self._naive_escape_bytes)
+
+    def render(self, cells: Iterable[Cell]) -> str:
+        if not color_depth():
+            return "".join(str(v) for v, _, _ in cells)
+
+        parts: list[str] = []
+        fg: tuple[int, ...] = ()
+        bg: tuple[int, ...] = ()
+        escapes = naive_escapes = 0
+        for v, c_fg, c_bg in cells:
+            if not (s := str(v)):
+                continue
+            new_fg = _sgr_values(c_fg.as_rgb) if c_fg else ()
+            new_bg = _sgr_values(c_bg.as_rgb, background=True) if c_bg else ()
+            if new_fg or new_bg:
+                naive_escapes += len(ansi_style(*new_fg, *new_bg)) + len(_RESET)
+            changes: list[int] = []
+            if new_fg != fg:
+                changes += new_fg or (39,)
+            if new_bg != bg:
+                changes += new_bg or (49,)
+            if changes:
+                parts.append(esc := ansi_style(*changes))
+                escapes += len(esc)
+            parts.append(s)
+            fg, bg = new_fg, new_bg
+        if fg or bg:
+            # Leave the terminal in its default state at the end of each line.
+            parts.append(_RESET)
+            escapes += len(_RESET)
+
+        self._escape_bytes += escapes
+        self._naive_escape_bytes += naive_escapes
+        return "".join(parts)
+
+    def render_rows(self, rows: Iterable[Iterable[Cell]]) -> Iterator[str]:
+        for cells in rows:
+            yield self.render(cells)
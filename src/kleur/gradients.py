@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from itertools import pairwise
+from typing import TYPE_CHECKING, NamedTuple
+
+from .arrays import ColorArray
+from .color import Color
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class _Segment(NamedTuple):
+    """Aligned hue, saturation & lightness ranges between two adjacent stops."""
+
+    position: float
+    span: float
+    hue: float
+    hue_span: float
+    saturation: float
+    saturation_span: float
+    lightness: float
+    lightness_span: float
+
+    @classmethod
+    def between(cls, start: tuple[float, Color], end: tuple[float, Color]) -> _Segment:
+        (p_c, c), (p_k, k) = start, end
+        c, k = c.align_with(k)
+        h_c, h_k = c.hue, k.hue
+        # Interpolate hues over the smallest angle (the same way as Color.blend does).
+        if abs(h_k - h_c) > 0.5:  # noqa: PLR2004
+            h_c += 1 if h_c < h_k else -1
+        return cls(
+            p_c,
+            p_k - p_c,
+            h_c,
+            h_k - h_c,
+            c.saturation,
+            k.saturation - c.saturation,
+            c.lightness,
+            k.lightness - c.lightness,
+        )
+
+    def values_at(self, position: float) -> tuple[float, float, float]:
+        try:
+            f = (position - self.position) / self.span
+        except ZeroDivisionError:
+            f = 0.0
+        return (
+            self.hue + self.hue_span * f,
+            self.saturation + self.saturation_span * f,
+            self.lightness + self.lightness_span * f,
+        )
+
+
+class Gradient:
+    """
+    Gradient through any number of color stops, at arbitrary positions.
+
+    Hues of adjacent stops are aligned once upon creation, after which a color at
+    any position is found by a binary search over the stops. Positions outside the
+    outer stops extrapolate the first / last segment, just like Color.blend does:
+    >>> c, k = Color(0.1, 1, 0.5), Color(0.9, 0.25, 0.75)
+    >>> g = Gradient.between(c, k)
+    >>> all(g(f) == c.blend(k, f) for f in [-0.5, 0, 0.25, 0.5, 1, 1.5])
+    True
+
+    >>> g = Gradient([(0, Color(0)), (0.5, Color(0.5, 0, 1)), (2, Color(0.25, 1, 0))])
+    >>> g.sample([0, 0.25, 0.5, 1.25])
+    ColorArray([HSLuv(  0.00°, 100.00%,  50.00%), HSLuv(  0.00°,  50.00%,  75.00%), HSLuv( 90.00°,   0.00%, 100.00%), HSLuv( 90.00°,  50.00%,  50.00%)])
+    """  # noqa: E501
+
+    def __init__(self, stops: Iterable[tuple[float, Color]]) -> None:
+        ss = sorted(stops, key=lambda s: s[0])
+        if not ss:
+            raise ValueError(ss)
+        pairs = list(pairwise(ss)) or [(ss[0], ss[0])]
+        self._segments = [_Segment.between(s, e) for s, e in pairs]
+        self._positions = [s.position for s in self._segments[1:]]
+
+    @classmethod
+    def between(cls, start: Color, end: Color) -> Gradient:
+        """Gradient from start (at position 0) to end (at position 1)."""
+        return cls([(0, start), (1, end)])
+
+    @classmethod
+    def evenly_spaced(cls, *colors: Color) -> Gradient:
+        """Gradient through the given colors, spaced evenly between 0 and 1."""
+        n = max(len(colors) - 1, 1)
+        return cls((i / n, c) for i, c in enumerate(colors))
+
+    def _segment_at(self, position: float) -> _Segment:
+        return self._segments[bisect_right(self._positions, position)]
+
+    def __call__(self, position: float) -> Color:
+        return Color(*self._segment_at(position).values_at(position))
+
+    def sample(self, positions: Iterable[float]) -> ColorArray:
+        """Colors at all given positions, at once."""
+        hs, ss, ls = [], [], []
+        for p in positions:
+            h, s, li = self._segment_at(p).values_at(p)
+            hs.append(h)
+            ss.append(s)
+            ls.append(li)
+        return ColorArray(hs, ss, ls)
@@ -0,0 +1,110 @@
+r"""
+Bulk parsing of RGB hex values (e.g. dumps of millions of colors) into packed RGB.
+
+Hex values are separated by commas and / or whitespace (like newlines), and can
+have any of the forms accepted by normalize_rgb_hex. When all of them are of the
+(most common) #rrggbb or rrggbb form, the whole buffer is checked & converted by
+a few passes of bytes.translate, substring searches and a single unhexlify, so no
+Python objects are created per value at all. Otherwise, only the values of other
+forms (and invalid values) are handled one at a time.
+
+>>> parsed = parse_hexes(b"ff8800\n#0AF, 3\n#12\nbogus,80830")
+>>> parsed.rgb.hex(" ", 3)
+'ff8800 00aaff 333333 121212'
+>>> parsed.errors
+[HexError(offset=19, entry=b'bogus'), HexError(offset=25, entry=b'80830')]
+>>> parsed.colors.as_hex
+['ff8800', '00aaff', '333333', '121212']
+"""
+
+import re
+from binascii import unhexlify
+from typing import TYPE_CHECKING, NamedTuple
+
+from .arrays import ColorArray
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+    from pathlib import Path
+
+# Same as the \s of (bytes) regexes, plus commas.
+_SEPARATORS = b" \t\n\r\x0b\x0c,"
+_HEX_DIGITS = b"0123456789abcdefABCDEF"
+
+
+def _shape(c: int) -> int:
+    if c in _HEX_DIGITS:
+        return ord("x")
+    if c in _SEPARATORS:
+        return ord(" ")
+    return c if c == ord("#") else ord("?")
+
+
+# Translation into the "shape" of the values: b"#ff8800, 0af" -> b"#xxxxxx  xxx".
+_SHAPES = bytes(_shape(c) for c in range(256))
+
+# Values that are not of the #rrggbb or rrggbb form.
+_IRREGULAR = re.compile(rb"(?<![^\s,])(?!#?[0-9a-fA-F]{6}(?![^\s,]))[^\s,]+")
+_SHORT = re.compile(rb"#?([0-9a-fA-F]{1,3})")
+
+
+class HexError(NamedTuple):
+    offset: int  # of the value, in bytes from the start of the buffer
+    entry: bytes
+
+
+class ParsedHexes(NamedTuple):
+    rgb: bytes  # packed: r, g, b (one byte each) per color
+    errors: list[HexError]
+
+    @property
+    def colors(self) -> ColorArray:
+        return ColorArray.from_packed_rgb(self.rgb)
+
+
+def _all_regular(data: bytes) -> bool:
+    """Check whether all values are of the #rrggbb or rrggbb form."""
+    shapes = b" %b " % data.translate(_SHAPES)
+    if any(s in shapes for s in (b"?", b"x#", b"##", b"# ", b"x" * 7)):
+        return False
+    digits = shapes.replace(b"#", b"")
+    return not any(b" %b " % (b"x" * n) in digits for n in range(1, 6))
+
+
+def _expanded(digits: bytes) -> bytes:
+    match len(digits):
+        case 1:
+            return digits * 6
+        case 2:
+            return digits * 3
+        case _:
+            r, g, b = digits[0:1], digits[1:2], digits[2:3]
+            return r * 2 + g * 2 + b * 2
+
+
+def parse_hexes(data: Buffer) -> ParsedHexes:
+    """
+    Parse RGB hex values into packed RGB, skipping (and reporting) invalid values.
+
+    :param data: hex values separated by commas and / or whitespace (e.g. bytes,
+                 or a memory-mapped file)
+    :return: packed RGB of the valid values, along with the invalid ones
+    """
+    if not isinstance(data, bytes):
+        data = memoryview(data).tobytes()
+    errors: list[HexError] = []
+
+    def normalized(m: re.Match[bytes]) -> bytes:
+        if short := _SHORT.fullmatch(m[0]):
+            return _expanded(short[1])
+        errors.append(HexError(m.start(), m[0]))
+        return b""
+
+    if not _all_regular(data):
+        data = _IRREGULAR.sub(normalized, data)
+    return ParsedHexes(unhexlify(data.translate(None, b"#" + _SEPARATORS)), errors)
+
+
+def parse_hex_file(path: Path) -> ParsedHexes:
+    """Parse RGB hex values from a file."""
+    return parse_hexes(path.read_bytes())
@@ -0,0 +1,168 @@
+r"""
+Streaming readers of raw image pixel data: PPM (P6), PAM (P7) or plain RGB bytes.
+
+Pixels are yielded in chunks of packed 8-bit RGB values (3 bytes per pixel),
+so only one chunk of an image has to be in memory at any time:
+>>> from io import BytesIO
+>>> ppm = b"P6 # tiny\n2 1\n15\n" + bytes([15, 0, 0, 0, 8, 15])
+>>> [chunk.hex() for chunk in read_rgb_chunks(BytesIO(ppm))]
+['ff00000088ff']
+>>> pam = b"P7\nWIDTH 2\nHEIGHT 1\nDEPTH 2\nMAXVAL 255\nENDHDR\n" + bytes([0, 1, 2, 3])
+>>> [chunk.hex() for chunk in read_rgb_chunks(BytesIO(pam))]
+['000000020202']
+"""
+
+import sys
+from array import array
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_WHITESPACE = b" \t\n\r\v\f"
+
+
+class ImageFormat(NamedTuple):
+    depth: int  # samples per pixel: 1 (grey), 2 (grey + alpha), 3 (RGB), 4 (RGBA)
+    max_value: int
+
+
+_RAW_RGB = ImageFormat(3, 255)
+
+
+def _read_exact(stream: BinaryIO, n: int) -> bytes:
+    """Read n bytes (or less at the end of the stream), also from pipes."""
+    data = stream.read(n)
+    while len(data) < n and (more := stream.read(n - len(data))):
+        data += more
+    return data
+
+
+def _ppm_tokens(stream: BinaryIO, n: int) -> list[bytes]:
+    """Read n whitespace separated header tokens (skipping comments)."""
+    tokens: list[bytes] = []
+    token = b""
+    while len(tokens) < n:
+        if not (char := stream.read(1)):
+            msg = "incomplete PPM header"
+            raise ValueError(msg)
+        if char == b"#":
+            stream.readline()
+        elif char in _WHITESPACE:
+            if token:
+                tokens.append(token)
+                token = b""
+        else:
+            token += char
+    # Exactly one whitespace character (the one after the last token) has been read.
+    return tokens
+
+
+def _header_value(name: str, token: bytes | None, upper: int) -> int:
+    if token is None:
+        msg = f"{name} missing from header"
+        raise ValueError(msg)
+    if not token.isdigit() or not 0 < (value := int(token)) <= upper:
+        msg = f"invalid {name} in header: {token.decode(errors='replace')}"
+        raise ValueError(msg)
+    return value
+
+
+def _image_format(
+    width: bytes | None,
+    height: bytes | None,
+    depth: bytes | None,
+    max_value: bytes | None,
+) -> ImageFormat:
+    _header_value("WIDTH", width, sys.maxsize)
+    _header_value("HEIGHT", height, sys.maxsize)
+    return ImageFormat(
+        _header_value("DEPTH", depth, sys.maxsize),
+        _header_value("MAXVAL", max_value, 65535),
+    )
+
+
+def _pam_header(stream: BinaryIO) -> ImageFormat:
+    fields: dict[bytes, bytes] = {}
+    while (line := stream.readline()) and line.strip() != b"ENDHDR":
+        key, _, value = line.strip().partition(b" ")
+        if key and not key.startswith(b"#"):
+            fields[key] = value.strip()
+    if not line:
+        msg = "incomplete PAM header (no ENDHDR)"
+        raise ValueError(msg)
+    keys = b"WIDTH", b"HEIGHT", b"DEPTH", b"MAXVAL"
+    return _image_format(*(fields.get(key) for key in keys))
+
+
+def read_header(stream: BinaryIO) -> ImageFormat:
+    r"""
+    Read a PPM / PAM header, leaving the stream at the start of the pixel data.
+
+    >>> from io import BytesIO
+    >>> read_header(BytesIO(b"hello"))
+    Traceback (most recent call last):
+    ...
+    ValueError: not a PPM (P6) or PAM (P7) image
+    >>> read_header(BytesIO(b"P6 2 1 0 "))
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid MAXVAL in header: 0
+    >>> read_header(BytesIO(b"P7\nWIDTH 2\nHEIGHT 1\nMAXVAL 255\nENDHDR\n"))
+    Traceback (most recent call last):
+    ...
+    ValueError: DEPTH missing from header
+    """
+    match stream.read(2):
+        case b"P6":
+            width, height, max_value = _ppm_tokens(stream, 3)
+            return _image_format(width, height, b"3", max_value)
+        case b"P7":
+            return _pam_header(stream)
+        case _:
+            msg = "not a PPM (P6) or PAM (P7) image"
+            raise ValueError(msg)
+
+
+def _to_rgb(data: bytes, image_format: ImageFormat) -> bytes:
+    depth, max_value = image_format
+    if max_value > 255:  # noqa: PLR2004
+        # 16-bit (big-endian) samples
+        samples = array("H", data)
+        if sys.byteorder == "little":
+            samples.byteswap()
+        data = bytes(v * 255 // max_value for v in samples)
+    elif max_value < 255:  # noqa: PLR2004
+        data = data.translate(bytes(min(v * 255 // max_value, 255) for v in range(256)))
+
+    if depth == 3:  # noqa: PLR2004
+        return data
+    rgb = bytearray(len(data) // depth * 3)
+    if depth < 3:  # noqa: PLR2004
+        # Greyscale (with or without alpha)
+        rgb[0::3] = rgb[1::3] = rgb[2::3] = data[0::depth]
+    else:
+        # Alpha (or any other extra channels) are ignored.
+        for channel in range(3):
+            rgb[channel::3] = data[channel::depth]
+    return bytes(rgb)
+
+
+def read_rgb_chunks(
+    stream: BinaryIO, chunk_size: int = 1 << 16, *, raw: bool = False
+) -> Iterator[bytes]:
+    """
+    Read the pixels of an image, in chunks of (at most) chunk_size pixels.
+
+    :param stream: binary stream of a PPM / PAM image (or of raw RGB data)
+    :param chunk_size: number of pixels per chunk
+    :param raw: the stream contains plain RGB bytes only (without any header)
+    :return: chunks of packed RGB bytes
+    """
+    image_format = _RAW_RGB if raw else read_header(stream)
+    depth, max_value = image_format
+    bytes_per_pixel = depth * (2 if max_value > 255 else 1)  # noqa: PLR2004
+    while data := _read_exact(stream, chunk_size * bytes_per_pixel):
+        # An incomplete pixel at the end is discarded.
+        data = data[: len(data) - len(data) % bytes_per_pixel]
+        yield _to_rgb(data, image_format)
@@ -0,0 +1,108 @@
+"""
+Mapping of RGB values onto the indexed xterm-256 & 16-color terminal palettes.
+
+The nearest palette entry is chosen in CIELUV space, in which (Euclidean) distances
+match perceived color differences a lot better than they do in RGB space.
+"""
+
+from functools import cache, lru_cache
+from math import dist
+from typing import TYPE_CHECKING
+
+from .hsluv_engine import rgb_to_xyz, xyz_to_luv
+
+if TYPE_CHECKING:
+    from .color import RGB
+
+type _Luv = tuple[float, float, float]
+
+# Default xterm values of the 16 "ANSI" colors (8 normal, followed by 8 bright ones).
+_ANSI_16 = [
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+]
+
+# xterm-256 indices 16-231: 6x6x6 RGB cube, 232-255: 24 shades of grey.
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+_GREY_LEVELS = tuple(range(8, 248, 10))
+
+
+def _nearest_levels(levels: tuple[int, ...]) -> bytes:
+    """Precomputed table: channel value (0-255) -> index of the nearest level."""
+    return bytes(
+        min(range(len(levels)), key=lambda i: abs(levels[i] - v)) for v in range(256)
+    )
+
+
+_CUBE_INDEX = _nearest_levels(_CUBE_LEVELS)
+_GREY_INDEX = _nearest_levels(_GREY_LEVELS)
+
+
+def _luv(rgb: RGB) -> _Luv:
+    r, g, b = rgb
+    return xyz_to_luv(rgb_to_xyz((r / 255, g / 255, b / 255)))
+
+
+def _xterm_256_rgb(index: int) -> RGB:
+    if index < 16:  # noqa: PLR2004
+        return _ANSI_16[index]
+    if index < 232:  # noqa: PLR2004
+        r, gb = divmod(index - 16, 36)
+        g, b = divmod(gb, 6)
+        return _CUBE_LEVELS[r], _CUBE_LEVELS[g], _CUBE_LEVELS[b]
+    grey = _GREY_LEVELS[index - 232]
+    return grey, grey, grey
+
+
+@cache
+def _xterm_256_luv() -> list[_Luv]:
+    return [_luv(_xterm_256_rgb(i)) for i in range(256)]
+
+
+@cache
+def _ansi_16_luv() -> list[_Luv]:
+    return [_luv(rgb) for rgb in _ANSI_16]
+
+
+@lru_cache(maxsize=4096)
+def xterm_256_index(rgb: RGB) -> int:
+    """
+    Index of the xterm-256 palette entry that is perceptually nearest.
+
+    The nearest cube entry and the nearest grey are found by table lookups,
+    after which only those two candidates are compared in CIELUV space.
+
+    >>> [xterm_256_index(rgb) for rgb in [(255, 0, 0), (128, 128, 128), (0, 170, 255)]]
+    [196, 244, 39]
+    """
+    r, g, b = rgb
+    cube = 16 + 36 * _CUBE_INDEX[r] + 6 * _CUBE_INDEX[g] + _CUBE_INDEX[b]
+    grey = 232 + _GREY_INDEX[(r + g + b) // 3]
+    target, palette = _luv(rgb), _xterm_256_luv()
+    return min(cube, grey, key=lambda i: dist(target, palette[i]))
+
+
+@lru_cache(maxsize=4096)
+def ansi_16_index(rgb: RGB) -> int:
+    """
+    Index of the 16-color palette entry that is perceptually nearest.
+
+    >>> [ansi_16_index(rgb) for rgb in [(255, 0, 0), (128, 128, 128), (0, 170, 255)]]
+    [9, 8, 12]
+    """
+    target, palette = _luv(rgb), _ansi_16_luv()
+    return min(range(16), key=lambda i: dist(target, palette[i]))
@@ -0,0 +1,140 @@
+"""
+Opt-in call counters & timers for the hot paths.
+
+While enabled, the instrumented functions are replaced by counting wrappers.
+Disabling puts the originals back, so there is no overhead at all otherwise.
+Times are inclusive: they contain the time spent in (instrumented) callees.
+
+>>> with instrumented():
+...     _ = Color(0.5).blend(Color(0.75), 0.5).as_hex
+>>> stats()["Color.blend"].calls
+1
+>>> stats()["Color.__init__"].calls
+3
+>>> _ = Color(0.5)
+>>> stats()["Color.__init__"].calls
+3
+
+Hashing & comparing colors takes their RGB values (conversions are cached):
+>>> with instrumented():
+...     _ = len({Color(0.5, 0.5), Color(0.5, 0.5)})
+>>> stats()["Color._key_rgb"].calls, stats()["color._converted"].calls
+(4, 1)
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import color, formatting
+from .color import _HSL, Color, conversion_cache
+from .formatting import ColorStr, DiffRenderer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+class CallStats(NamedTuple):
+    calls: int
+    seconds: float
+
+
+_TARGETS: list[tuple[type | object, str]] = [
+    (_HSL, "from_hex"),
+    (_HSL, "from_rgb"),
+    (_HSL, "_as_rgb_floats"),
+    (_HSL, "rgb_floats_in"),
+    # The conversions that actually take place (conversion cache misses).
+    (color, "_converted"),
+    (Color, "__init__"),
+    (Color, "_key_rgb"),
+    (Color, "blend"),
+    (ColorStr, "__new__"),
+    (formatting, "color_rgb"),
+    (formatting, "_sgr_values"),
+    (DiffRenderer, "render"),
+]
+
+# Per instrumented function: number of calls & total time (in nanoseconds).
+_counters: dict[str, list[int]] = {}
+_originals: dict[tuple[type | object, str], object] = {}
+
+
+def _label(owner: type | object, attr: str) -> str:
+    name: str = getattr(owner, "__name__", "")
+    return f"{name.rsplit('.', 1)[-1]}.{attr}"
+
+
+def _counting[**P, R](label: str, func: Callable[P, R]) -> Callable[P, R]:
+    counter = _counters.setdefault(label, [0, 0])
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_counter_ns() - start
+
+    return wrapper
+
+
+def _instrumented(label: str, attr: object) -> object:
+    match attr:
+        case classmethod() | staticmethod():
+            return type(attr)(_counting(label, attr.__func__))
+        case property(fget=fget) if fget:
+            return property(_counting(label, fget))
+        case _ if callable(attr):
+            return _counting(label, attr)
+        case _:
+            raise TypeError(attr)
+
+
+def enable() -> None:
+    for owner, attr in _TARGETS:
+        if (owner, attr) not in _originals:
+            original = vars(owner)[attr]
+            _originals[owner, attr] = original
+            setattr(owner, attr, _instrumented(_label(owner, attr), original))
+
+
+def disable() -> None:
+    for (owner, attr), original in _originals.items():
+        setattr(owner, attr, original)
+    _originals.clear()
+
+
+def reset() -> None:
+    for counter in _counters.values():
+        counter[:] = [0, 0]
+
+
+@contextmanager
+def instrumented() -> Iterator[None]:
+    """Count calls within the context only (starting from zero)."""
+    reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def stats() -> dict[str, CallStats]:
+    return {
+        label: CallStats(calls, ns / 1e9) for label, (calls, ns) in _counters.items()
+    }
+
+
+def summary() -> Iterator[str]:
+    yield f"{'':<28}{'calls':>12}{'total':>12}{'per call':>12}"
+    for label, (calls, seconds) in sorted(stats().items(), key=lambda i: -i[1][1]):
+        if calls:
+            total, per_call = seconds * 1e3, seconds / calls * 1e6
+            yield f"{label:<28}{calls:>12,}{total:>10,.1f}ms{per_call:>10,.2f}us"
+    hits, misses, evictions, *_ = conversion_cache.stats
+    cache = f"{hits:,} hits, {misses:,} misses, {evictions:,} evictions"
+    yield f"conversion cache (process-wide): {cache}"
@@ -0,0 +1,162 @@
+"""
+Nearest named colors, found through a k-d tree in CIELUV space.
+
+In CIELUV, (Euclidean) distances match perceived color differences a lot better
+than they do in RGB or HSLuv space, so the nearest entry is the one that looks
+the most alike.
+"""
+
+import heapq
+from math import dist, sqrt
+from typing import TYPE_CHECKING, NamedTuple
+
+from based_utils.class_utils import get_class_vars
+
+from .color import Color
+from .exporting import palette_swatches
+from .spaces import color_space
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+type _Luv = tuple[float, float, float]
+
+
+def _luv(color: Color) -> _Luv:
+    h, s, li = color.hue * 360, color.saturation * 100, color.lightness * 100
+    luv_l, luv_u, luv_v = color_space().to_luv((h, s, li))
+    return luv_l, luv_u, luv_v
+
+
+def color_distance(color: Color, other: Color) -> float:
+    """
+    Perceptual distance between two colors (CIELUV delta E).
+
+    >>> red, green = Color.from_hex("f00"), Color.from_hex("0f0")
+    >>> round(color_distance(red, green), 2), color_distance(red, red)
+    (269.53, 0.0)
+    """
+    return dist(_luv(color), _luv(other))
+
+
+class Match(NamedTuple):
+    name: str
+    color: Color
+    distance: float
+
+
+class PaletteIndex:
+    """
+    Named colors, indexed for nearest neighbour queries.
+
+    The colors are stored in a (balanced) k-d tree, so a query
+    only has to visit a small (logarithmic) part of the entries:
+    >>> from kleur import Colors
+    >>> index = PaletteIndex.from_palette(Colors)
+    >>> [m.name for m in index.nearest(Color.from_hex("ff8000"), 3)]
+    ['orange', 'red', 'brown']
+
+    Results are the same as those of an exhaustive search:
+    >>> shades = [s / 10 for s in range(1, 10)]
+    >>> index = PaletteIndex.from_palette(Colors, shades, [0.5, 1])
+    >>> len(index)
+    207
+    >>> queries = [Color(i / 97, i % 5 / 4, i % 11 / 10) for i in range(97)]
+    >>> def exhaustive(c: Color, k: int) -> list[str]:
+    ...     entries = sorted(index.entries, key=lambda e: color_distance(c, e[1]))
+    ...     return [name for name, _ in entries[:k]]
+    >>> all([m.name for m in index.nearest(c, 3)] == exhaustive(c, 3) for c in queries)
+    True
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, Color]]) -> None:
+        self.entries = list(entries)
+        self._points = [_luv(color) for _, color in self.entries]
+        # Tree layout: the root of every (sub)range [lo, hi) is at its middle.
+        self._order = list(range(len(self.entries)))
+        self._build(0, len(self._order), 0)
+
+    @classmethod
+    def from_palette(
+        cls,
+        palette_cls: type,
+        shades: Sequence[float] = None,
+        vibrances: Sequence[float] = None,
+    ) -> PaletteIndex:
+        """
+        Index of the colors of a palette class.
+
+        :param palette_cls: palette class (e.g. Colors)
+        :param shades: when given, index these shades (of the colors & grey)
+                       instead of the palette colors themselves
+        :param vibrances: saturations to expand the shades with (default: 1)
+        """
+        colors = get_class_vars(palette_cls, value_type=Color)
+        if shades is None:
+            return cls(colors.items())
+        swatches = palette_swatches(colors, shades, vibrances or [1])
+        return cls((f"{g}-{n}", c) for g, n, c in swatches)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _build(self, lo: int, hi: int, depth: int) -> None:
+        if hi - lo < 2:  # noqa: PLR2004
+            return
+        axis, points = depth % 3, self._points
+        self._order[lo:hi] = sorted(self._order[lo:hi], key=lambda i: points[i][axis])
+        mid = (lo + hi) // 2
+        self._build(lo, mid, depth + 1)
+        self._build(mid + 1, hi, depth + 1)
+
+    def _search(
+        self,
+        target: _Luv,
+        k: int,
+        heap: list[tuple[float, int]],
+        bounds: tuple[int, int],
+        depth: int,
+    ) -> None:
+        lo, hi = bounds
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        i = self._order[mid]
+        point = self._points[i]
+        # Max-heap (by negated squared distances) of the k best entries so far.
+        # On equal distances, the entry that was added to the index first wins.
+        d = sum((t - p) ** 2 for t, p in zip(target, point, strict=True))
+        if len(heap) < k:
+            heapq.heappush(heap, (-d, -i))
+        elif (-d, -i) > heap[0]:
+            heapq.heapreplace(heap, (-d, -i))
+
+        diff = target[depth % 3] - point[depth % 3]
+        near, far = (
+            ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+        )
+        self._search(target, k, heap, near, depth + 1)
+        # The far side can only contain better entries if it is within reach.
+        if len(heap) < k or diff * diff < -heap[0][0]:
+            self._search(target, k, heap, far, depth + 1)
+
+    def nearest(self, color: Color, k: int = 1) -> list[Match]:
+        """Find the k entries nearest to a color (nearest first)."""
+        heap: list[tuple[float, int]] = []
+        self._search(_luv(color), k, heap, (0, len(self._order)), 0)
+        matches = []
+        for d, i in sorted(heap, reverse=True):
+            name, entry = self.entries[-i]
+            matches.append(Match(name, entry, sqrt(-d)))
+        return matches
+
+    def nearest_many(self, colors: Iterable[Color], k: int = 1) -> list[list[Match]]:
+        """Batch query: nearest entries for each color (duplicates looked up once)."""
+        results: dict[tuple[float, ...], list[Match]] = {}
+        matches = []
+        for color in colors:
+            key = tuple(color)
+            if key not in results:
+                results[key] = self.nearest(color, k)
+            matches.append(results[key])
+        return matches
@@ -0,0 +1,126 @@
+"""
+Batch conversions spread over multiple cores.
+
+On free-threaded builds (with the GIL disabled) the work is split over a pool of
+threads, sharing the caches without any pickling. With the GIL enabled, threads
+would only take turns, so a pool of processes is used instead.
+
+Shared state can safely be used from multiple threads at the same time:
+- LRU caches (like conversion_cache) guard their entries with a lock
+- interned colors are registered under a lock
+- lazily computed values (like Color.as_rgb or ColorArray.as_hex) might be
+  computed twice by racing threads, but always to the same (immutable) result
+
+>>> hexes = [f"{i:06x}" for i in range(0, 1 << 24, 1 << 12)]
+>>> colors = colors_from_hex(hexes, workers=2, pool="threads")
+>>> colors_as_hex(colors, workers=2, pool="threads") == hexes
+True
+>>> colors.as_rgb == ColorArray.from_hex(hexes).as_rgb
+True
+"""
+
+import os
+import sys
+from concurrent import futures
+from math import ceil
+from operator import attrgetter
+from typing import TYPE_CHECKING, Literal, Protocol, Self
+
+from .arrays import ColorArray
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from .color import RGB
+    from .gradients import Gradient
+
+type Pool = Literal["threads", "processes"]
+
+# Smaller chunks aren't worth the overhead of handing them to a worker.
+_MIN_CHUNK_SIZE = 1024
+
+
+class _Sliceable(Protocol):
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: slice) -> Self: ...
+
+
+def gil_enabled() -> bool:
+    return sys._is_gil_enabled()  # noqa: SLF001
+
+
+def default_pool() -> Pool:
+    return "processes" if gil_enabled() else "threads"
+
+
+def _chunks[S: _Sliceable](items: S, workers: int) -> list[S]:
+    # A few chunks per worker, so they're balanced when some finish earlier.
+    size = max(ceil(len(items) / (workers * 4)), _MIN_CHUNK_SIZE)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _mapped[S: _Sliceable, R](
+    func: Callable[[S], R], items: S, workers: int | None, pool: Pool | None
+) -> list[R]:
+    """Results of func for consecutive chunks of the items, in order."""
+    n = workers or os.process_cpu_count() or 1
+    chunks = _chunks(items, n)
+    if n == 1 or len(chunks) < 2:  # noqa: PLR2004
+        return [func(chunk) for chunk in chunks]
+    executor_cls = (
+        futures.ThreadPoolExecutor
+        if (pool or default_pool()) == "threads"
+        else futures.ProcessPoolExecutor
+    )
+    with executor_cls(n) as executor:
+        return list(executor.map(func, chunks))
+
+
+def colors_from_hex(
+    rgb_hexes: Sequence[str], *, workers: int = None, pool: Pool = None
+) -> ColorArray:
+    """
+    Create a ColorArray from RGB hex strings, in parallel.
+
+    :param rgb_hexes: RGB hex strings (may start with '#')
+    :param workers: number of workers (default: number of available CPUs)
+    :param pool: "threads" or "processes" (default: depends on the GIL)
+    """
+    return ColorArray.concatenated(
+        _mapped(ColorArray.from_hex, rgb_hexes, workers, pool)
+    )
+
+
+def colors_from_rgb(
+    rgbs: Sequence[RGB], *, workers: int = None, pool: Pool = None
+) -> ColorArray:
+    """Create a ColorArray from RGB values, in parallel."""
+    return ColorArray.concatenated(_mapped(ColorArray.from_rgb, rgbs, workers, pool))
+
+
+def colors_as_hex(
+    colors: ColorArray, *, workers: int = None, pool: Pool = None
+) -> list[str]:
+    """RGB hex strings of the colors, converted in parallel."""
+    chunks = _mapped(attrgetter("as_hex"), colors, workers, pool)
+    return [h for chunk in chunks for h in chunk]
+
+
+def colors_as_rgb(
+    colors: ColorArray, *, workers: int = None, pool: Pool = None
+) -> list[RGB]:
+    """RGB values of the colors, converted in parallel."""
+    chunks = _mapped(attrgetter("as_rgb"), colors, workers, pool)
+    return [rgb for chunk in chunks for rgb in chunk]
+
+
+def sample_gradient(
+    gradient: Gradient,
+    positions: Sequence[float],
+    *,
+    workers: int = None,
+    pool: Pool = None,
+) -> ColorArray:
+    """Colors of a gradient at all given positions, sampled in parallel."""
+    return ColorArray.concatenated(_mapped(gradient.sample, positions, workers, pool))
@@ -0,0 +1,134 @@
+"""
+Precomputed 24-bit RGB -> HSLuv lookup table, read through mmap.
+
+File format (version 1, little-endian):
+- header: magic (8 bytes), version (uint16), 2 padding bytes,
+  number of entries (uint32) & SHA-256 digest of the data (32 bytes)
+- data: for each RGB value (in rrggbb order) the HSLuv hue, saturation & lightness
+  as three float64 values, exactly as calculated by rgb_to_hsluv()
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+from array import array
+from functools import cache
+from pathlib import Path
+from struct import Struct
+from typing import TYPE_CHECKING, Self
+
+from .hsluv_engine import rgb_to_hsluv
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import TracebackType
+
+_MAGIC = b"KLEURRGB"
+_VERSION = 1
+_HEADER = Struct("<8sHxxI32s")
+_ENTRY = Struct("<3d")
+_SIZE = 1 << 24
+
+type HSLuvTuple = tuple[float, float, float]
+
+
+def default_rgb_table_path() -> Path:
+    if path := os.environ.get("KLEUR_RGB_TABLE"):
+        return Path(path)
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_dir) / "kleur" / f"rgb_hsluv.v{_VERSION}.bin"
+
+
+def _chunks() -> Iterator[bytes]:
+    """Calculate the table data, one chunk (all green & blue values) per red value."""
+    levels = [v / 255 for v in range(256)]
+    for r in levels:
+        values = array("d")
+        for g in levels:
+            for b in levels:
+                values.extend(rgb_to_hsluv((r, g, b)))
+        if sys.byteorder == "big":
+            values.byteswap()
+        yield values.tobytes()
+
+
+def build_rgb_table(path: Path = None) -> Path:
+    """
+    Calculate all 16.7M RGB -> HSLuv conversions and write them to disk.
+
+    The table is written to a temporary file first, which replaces the
+    target file only when complete, so readers never see a partial table.
+    """
+    path = path or default_rgb_table_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    digest = hashlib.sha256()
+    with tmp_path.open("wb") as f:
+        f.write(bytes(_HEADER.size))
+        for chunk in _chunks():
+            digest.update(chunk)
+            f.write(chunk)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, _SIZE, digest.digest()))
+    tmp_path.replace(path)
+    return path
+
+
+class RgbTable:
+    """
+    Memory-mapped RGB -> HSLuv lookup table.
+
+    Only the pages that are actually looked up will be loaded into memory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        n, expected_size = len(self._mm), _HEADER.size + _SIZE * _ENTRY.size
+        header = _HEADER.unpack_from(self._mm) if n >= _HEADER.size else None
+        if not header or header[:3] != (_MAGIC, _VERSION, _SIZE) or n != expected_size:
+            self.close()
+            raise ValueError(path)
+        self._digest = header[3]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __getitem__(self, rgb: int) -> HSLuvTuple:
+        """Look up the HSLuv values for a 24-bit RGB value (0xrrggbb)."""
+        h, s, li = _ENTRY.unpack_from(self._mm, _HEADER.size + rgb * _ENTRY.size)
+        return h, s, li
+
+    def verify(self) -> bool:
+        """Check the table data against the checksum stored in the header."""
+        data = memoryview(self._mm)[_HEADER.size :]
+        try:
+            return hashlib.sha256(data).digest() == self._digest
+        finally:
+            data.release()
+
+
+@cache
+def rgb_table() -> RgbTable | None:
+    """
+    Lookup table at the default location, if available.
+
+    When the table is absent (or invalid), conversions will fall back to the math.
+    """
+    try:
+        return RgbTable(default_rgb_table_path())
+    except (OSError, ValueError):
+        return None
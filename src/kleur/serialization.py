@@ -0,0 +1,153 @@
+"""
+Compact, versioned binary format for colors, color arrays & palettes.
+
+Only hue, saturation & lightness are stored (as doubles, column by column), so
+unlike pickles, no class references or cached conversions are included. Arrays
+& palettes can be read from any buffer (e.g. shared memory, or a memory-mapped
+file) without copying: their columns become views on the buffer itself.
+
+Layout (little-endian):
+- header (16 bytes): magic, version, kind (color / array / palette), count
+- palettes only: length of the names (4 bytes), the names (UTF-8, one per line:
+  the palette itself, then its colors), padded to a multiple of 8 bytes
+- hues, saturations & lightnesses: count doubles each
+
+>>> from kleur import Colors
+>>> colors = ColorArray.from_hex(["f80", "7ab1e5"])
+>>> data = dump_colors(colors)
+>>> len(data)
+64
+>>> load_colors(memoryview(data)).as_hex
+['ff8800', '7ab1e5']
+>>> load_color(dump_color(Colors.blue))
+HSLuv(248.00°, 100.00%,  50.00%)
+>>> palette = load_palette(dump_palette(Colors))
+>>> palette.__name__, palette.brown == Colors.brown
+('Colors', True)
+"""
+
+import struct
+import sys
+from array import array
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from based_utils.class_utils import get_class_vars
+
+from .arrays import ColorArray
+from .color import Color
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+    from .arrays import Column
+
+_MAGIC = b"KLR\x00"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxQ")
+_NAMES_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+
+class _Kind(IntEnum):
+    COLOR = 1
+    ARRAY = 2
+    PALETTE = 3
+
+
+def _padded(data: bytes) -> bytes:
+    return data + bytes(-len(data) % _ALIGNMENT)
+
+
+def _columns_bytes(colors: ColorArray) -> bytes:
+    columns = [
+        array("d", c) for c in (colors.hues, colors.saturations, colors.lightnesses)
+    ]
+    if sys.byteorder == "big":
+        for c in columns:
+            c.byteswap()
+    return b"".join(c.tobytes() for c in columns)
+
+
+def _dumped(kind: _Kind, colors: ColorArray, prefix: bytes = b"") -> bytes:
+    header = _HEADER.pack(_MAGIC, _VERSION, kind, len(colors))
+    return header + prefix + _columns_bytes(colors)
+
+
+def _header(view: memoryview, kind: _Kind) -> int:
+    """Check the header & return the number of colors."""
+    if len(view) < _HEADER.size:
+        raise ValueError(len(view))
+    magic, version, actual_kind, n = _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != _VERSION or actual_kind != kind:
+        raise ValueError(magic, version, actual_kind)
+    return int(n)
+
+
+def _column(view: memoryview, offset: int, n: int) -> Column:
+    column = view[offset : offset + n * 8].cast("d")
+    if sys.byteorder == "little":
+        return column
+    # Stored as little-endian, so a copy is needed here.
+    swapped = array("d", column)
+    swapped.byteswap()
+    return swapped
+
+
+def _loaded(view: memoryview, offset: int, n: int) -> ColorArray:
+    if len(view) != offset + 3 * n * 8:
+        raise ValueError(len(view))
+    hues, saturations, lightnesses = (
+        _column(view, offset + i * n * 8, n) for i in range(3)
+    )
+    return ColorArray.wrapping(hues, saturations, lightnesses)
+
+
+def dump_color(color: Color) -> bytes:
+    return _dumped(_Kind.COLOR, ColorArray.from_colors([color]))
+
+
+def load_color(data: Buffer) -> Color:
+    view = memoryview(data).cast("B")
+    return _loaded(view, _HEADER.size, _header(view, _Kind.COLOR))[0]
+
+
+def dump_colors(colors: ColorArray) -> bytes:
+    return _dumped(_Kind.ARRAY, colors)
+
+
+def load_colors(data: Buffer) -> ColorArray:
+    """Load colors, of which the values are read from the given buffer directly."""
+    view = memoryview(data).cast("B")
+    return _loaded(view, _HEADER.size, _header(view, _Kind.ARRAY))
+
+
+def dump_palette(palette_cls: type) -> bytes:
+    """Dump the colors of a palette class (like Colors), along with their names."""
+    colors = get_class_vars(palette_cls, value_type=Color)
+    names = "\n".join([palette_cls.__name__, *colors]).encode()
+    prefix = _padded(_NAMES_LENGTH.pack(len(names)) + names)
+    return _dumped(_Kind.PALETTE, ColorArray.from_colors(colors.values()), prefix)
+
+
+def load_palette(data: Buffer) -> type:
+    """
+    Load a palette class, with a class attribute per (named) color.
+
+    Malformed (e.g. truncated) data is rejected:
+    >>> from kleur import Colors
+    >>> load_palette(dump_palette(Colors)[:18])
+    Traceback (most recent call last):
+    ...
+    ValueError: 18
+    """
+    view = memoryview(data).cast("B")
+    n = _header(view, _Kind.PALETTE)
+    names_offset = _HEADER.size + _NAMES_LENGTH.size
+    if len(view) < names_offset:
+        raise ValueError(len(view))
+    (length,) = _NAMES_LENGTH.unpack_from(view, _HEADER.size)
+    name, *names = str(view[names_offset : names_offset + length], "utf-8").split("\n")
+    offset = names_offset + length + -(_NAMES_LENGTH.size + length) % _ALIGNMENT
+    colors = _loaded(view, offset, n)
+    return type(name, (), dict(zip(names, colors, strict=True)))
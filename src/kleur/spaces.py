@@ -0,0 +1,194 @@
+"""
+Color spaces in which the hue, saturation & lightness of colors are expressed.
+
+All color math (shades, blends, gradients, palettes) works on hue, saturation &
+lightness, so by choosing another space, the same math yields different colors:
+- HSLuv (default): CIELUV based, with the saturation relative to the maximum
+  chroma of the sRGB gamut (exactly, by intersecting its boundary lines)
+- OKLCH: Oklab based (more uniform hues, especially blues), with the saturation
+  relative to the maximum chroma as well, found by a (cheap) binary search
+
+Values are expressed as hue (0 - 360), saturation (0 - 100) & lightness (0 - 100),
+where a saturation of 100 is the most saturated color within the sRGB gamut:
+>>> for name, space in SPACES.items():
+...     r, g, b = space.to_rgb((30, 100, 60))
+...     print(name, f"{r:.3f} {g:.3f} {b:.3f}")
+hsluv 0.890 0.443 0.000
+oklch 0.933 0.074 0.000
+>>> [round(v, 4) for v in OKLCH.from_rgb(OKLCH.to_rgb((264, 50, 40)))]
+[264.0, 50.0, 40.0]
+>>> [round(v, 2) for v in OKLCH.from_rgb((1, 1, 1))]
+[0, 0, 100.0]
+"""
+
+import os
+from abc import ABC, abstractmethod
+from functools import cache, lru_cache
+from math import atan2, cbrt, cos, degrees, hypot, radians, sin
+
+from .hsluv_engine import (
+    from_linear,
+    hsluv_to_lch,
+    hsluv_to_rgb,
+    lch_to_luv,
+    rgb_to_hsluv,
+    rgb_to_xyz,
+    to_linear,
+    xyz_to_luv,
+)
+
+type Floats = tuple[float, float, float]
+
+
+class ColorSpace(ABC):
+    name: str
+    label: str  # As shown in the repr of colors
+
+    @abstractmethod
+    def to_rgb(self, hsl: Floats) -> Floats:
+        """Convert hue, saturation & lightness to RGB (0 - 1)."""
+
+    @abstractmethod
+    def from_rgb(self, rgb: Floats) -> Floats:
+        """Convert RGB (0 - 1) to hue, saturation & lightness."""
+
+    def to_luv(self, hsl: Floats) -> Floats:
+        """Convert hue, saturation & lightness to CIELUV (for perceptual distances)."""
+        return xyz_to_luv(rgb_to_xyz(self.to_rgb(hsl)))
+
+
+class HSLuvSpace(ColorSpace):
+    name = "hsluv"
+    label = "HSLuv"
+
+    def to_rgb(self, hsl: Floats) -> Floats:
+        return hsluv_to_rgb(hsl)
+
+    def from_rgb(self, rgb: Floats) -> Floats:
+        return rgb_to_hsluv(rgb)
+
+    def to_luv(self, hsl: Floats) -> Floats:
+        # Directly, so without clipping (or rounding) to RGB first.
+        return lch_to_luv(hsluv_to_lch(hsl))
+
+
+def _oklab_to_linear_rgb(lightness: float, a: float, b: float) -> Floats:
+    l_ = (lightness + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m_ = (lightness - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s_ = (lightness - 0.0894841775 * a - 1.2914855480 * b) ** 3
+    return (
+        4.0767416621 * l_ - 3.3077115913 * m_ + 0.2309699292 * s_,
+        -1.2684380046 * l_ + 2.6097574011 * m_ - 0.3413193965 * s_,
+        -0.0041960863 * l_ - 0.7034186147 * m_ + 1.7076147010 * s_,
+    )
+
+
+def _linear_rgb_to_oklab(r: float, g: float, b: float) -> Floats:
+    l_ = cbrt(0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b)
+    m_ = cbrt(0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b)
+    s_ = cbrt(0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b)
+    return (
+        0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+        1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+        0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_,
+    )
+
+
+# Chroma beyond the sRGB gamut for any lightness & hue.
+_OKLCH_CHROMA_LIMIT = 0.4
+# Number of chroma samples in the coarse search for the gamut boundary.
+_OKLCH_CHROMA_STEPS = 64
+# Precision of the maximum chroma, and tolerance of the gamut check.
+_OKLCH_PRECISION = 1e-9
+# Greys have a chroma below this (not exactly 0, due to rounding of the matrices).
+_OKLCH_ACHROMATIC = 1e-6
+
+
+def _in_gamut(rgb: Floats) -> bool:
+    return all(-_OKLCH_PRECISION <= c <= 1 + _OKLCH_PRECISION for c in rgb)
+
+
+@lru_cache(maxsize=1 << 14)
+def _max_chroma(lightness: float, hue: float) -> float:
+    """Highest chroma within the sRGB gamut, for a lightness (0 - 1) & hue."""
+    if not 0 < lightness < 1:
+        return 0
+    a, b = cos(radians(hue)), sin(radians(hue))
+    # Going outwards, a color might leave the gamut and enter it again (for blues,
+    # red dips just below 0), so the outermost sample within the gamut is refined.
+    step = _OKLCH_CHROMA_LIMIT / _OKLCH_CHROMA_STEPS
+    i = _OKLCH_CHROMA_STEPS - 1
+    while i and not _in_gamut(
+        _oklab_to_linear_rgb(lightness, a * i * step, b * i * step)
+    ):
+        i -= 1
+    lo, hi = i * step, (i + 1) * step
+    while hi - lo > _OKLCH_PRECISION:
+        mid = (lo + hi) / 2
+        if _in_gamut(_oklab_to_linear_rgb(lightness, a * mid, b * mid)):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+class OKLCHSpace(ColorSpace):
+    name = "oklch"
+    label = "OKLCH"
+
+    def to_rgb(self, hsl: Floats) -> Floats:
+        h, s, li = hsl
+        lightness = li / 100
+        chroma = _max_chroma(lightness, h) * s / 100
+        hrad = radians(h)
+        linear = _oklab_to_linear_rgb(lightness, chroma * cos(hrad), chroma * sin(hrad))
+        # Gamut mapping: anything still out of bounds is only off by a hair.
+        r, g, b = (min(max(from_linear(c), 0), 1) for c in linear)
+        return r, g, b
+
+    def from_rgb(self, rgb: Floats) -> Floats:
+        r, g, b = (to_linear(c) for c in rgb)
+        lightness, a, b = _linear_rgb_to_oklab(r, g, b)
+        chroma = hypot(a, b)
+        if chroma < _OKLCH_ACHROMATIC:
+            return 0, 0, lightness * 100
+        h = degrees(atan2(b, a)) % 360
+        max_chroma = _max_chroma(lightness, h)
+        s = min(chroma / max_chroma, 1) if max_chroma else 0
+        return h, s * 100, lightness * 100
+
+
+HSLUV = HSLuvSpace()
+OKLCH = OKLCHSpace()
+
+SPACES: dict[str, ColorSpace] = {s.name: s for s in (HSLUV, OKLCH)}
+
+
+@cache
+def color_space() -> ColorSpace:
+    """Color space of all colors (KLEUR_COLOR_SPACE: hsluv or oklch, default: hsluv)."""
+    return SPACES.get(os.environ.get("KLEUR_COLOR_SPACE", "").lower(), HSLUV)
+
+
+def set_color_space(name: str) -> None:
+    """
+    Set the color space for this process (and the ones started from it).
+
+    Colors keep their hue, saturation & lightness, but will have other RGB values:
+    >>> from kleur import Color
+    >>> c = Color(30 / 360, 1, 0.6)
+    >>> c.as_hex
+    'e37100'
+    >>> set_color_space("oklch")
+    >>> c.as_hex
+    'ee1300'
+    >>> set_color_space("hsluv")
+    >>> set_color_space("cmyk")
+    Traceback (most recent call last):
+    ...
+    ValueError: cmyk
+    """
+    if name not in SPACES:
+        raise ValueError(name)
+    os.environ["KLEUR_COLOR_SPACE"] = name
+    color_space.cache_clear()